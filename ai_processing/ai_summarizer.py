@@ -1,21 +1,67 @@
 """
 AI summarization module using OpenAI with FitBUX brand voice
 """
+import asyncio
 import openai
-from typing import List, Dict
+from typing import List, Dict, Optional
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.config import *
+from common.keyword_matcher import THEME_MATCHER
+from ai_processing.summary_cache import SummaryCache, hash_text
+from ai_processing.usage_tracker import UsageTracker
+from ai_processing.input_preparation import prepare_content, count_tokens
+from ai_processing.batch_summarizer import BatchApiSummarizer
+from ai_processing.extractive_summarizer import extractive_summary
+from ai_processing.relevance_gate import RelevanceGate
+from common.token_bucket import RequestTokenRateLimiter
 import json
 import os
+import time
+from datetime import datetime
+import pytz
+
+# Static task instructions. Together with the brand guidelines they form a
+# byte-identical prompt prefix, so the provider's prompt cache can reuse it;
+# per-item text always goes last, in the user message.
+SUMMARY_INSTRUCTIONS = """Summarize the financial content in the user message in 2-3 sentences for young professionals (20-40 years old).
+Use FitBUX's Innocent Everyman voice: calm, trustworthy, educational, and empowering.
+Focus on what this means for their personal finances and why it matters.
+Always end with either a lesson, next step, or feeling of progress."""
+
+BATCH_SUMMARY_INSTRUCTIONS = """Summarize each financial content item in the user message (a JSON list) in 2-3 sentences for young professionals (20-40 years old).
+Use FitBUX's Innocent Everyman voice: calm, trustworthy, educational, and empowering.
+Focus on what each item means for their personal finances and why it matters.
+Always end each summary with either a lesson, next step, or feeling of progress.
+Respond with a JSON object of the form {"summaries": {"<item id>": "<summary>"}} with one entry per item."""
+
+PERSPECTIVE_INSTRUCTIONS = """Write a 3-5 sentence summary of today's financial landscape for young professionals (20-40), based on the themes in the user message.
+Use FitBUX's Innocent Everyman voice: calm, trustworthy, educational, and empowering.
+Acknowledge any concerns but provide reassurance and direction.
+End with a sense of progress or next steps."""
 
 class AISummarizer:
     def __init__(self):
-        self.client = openai.OpenAI(api_key=OPENAI_API_KEY)
+        self.client = openai.OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
         
         # Load brand guidelines
         self.brand_guidelines = self._load_brand_guidelines()
+        self.system_prefix = (
+            "You are FitBUX's financial content writer. Always use the Innocent Everyman voice: "
+            "calm, trustworthy, educational, and empowering. Follow the brand voice guidelines below.\n\n"
+            + self.brand_guidelines
+        )
+        
+        # Cached outputs are keyed on the prompts that produced them, so any prompt edit invalidates them
+        self.summary_prompt_hash = hash_text(self.system_prefix, SUMMARY_INSTRUCTIONS, BATCH_SUMMARY_INSTRUCTIONS)
+        self.perspective_prompt_hash = hash_text(self.system_prefix, PERSPECTIVE_INSTRUCTIONS)
+        self.usage = UsageTracker()
+        self.relevance_gate = RelevanceGate(self.brand_guidelines)
+        self.summary_cache = SummaryCache()
+        
+        # Shared by every async summarization call in this process
+        self.rate_limiter = RequestTokenRateLimiter(OPENAI_REQUESTS_PER_MINUTE, OPENAI_TOKENS_PER_MINUTE)
     
     def _load_brand_guidelines(self) -> str:
         """Load brand guidelines from file"""
@@ -26,57 +72,366 @@ class AISummarizer:
         except FileNotFoundError:
             return "Use FitBUX's Innocent Everyman voice: calm, trustworthy, educational, and empowering."
     
-    def summarize_content(self, content: Dict) -> str:
+    def _fallback_summary(self, content: Dict) -> str:
+        """Summary used when the model can't produce one (or isn't needed): extracted from the prepared item itself"""
+        summary = extractive_summary(content)
+        if summary:
+            return summary
+        return f"Important financial update from {content.get('source', 'Unknown')}: {content.get('title', 'No title available')}"
+    
+    def _use_fast_path(self, content: Dict) -> bool:
         """
-        Summarize a single piece of content using FitBUX's brand voice
+        Whether an item can skip the LLM (low-priority content types only)
         
         Args:
-            content: Dictionary containing title, description, url, source, etc.
+            content: Prepared content dictionary
             
         Returns:
-            Summary string in FitBUX voice
+            True to summarize the item locally
+        """
+        return SUMMARY_FAST_PATH and content.get('content_type') in SUMMARY_FAST_PATH_CONTENT_TYPES
+    
+    def _messages(self, instructions: str, payload: str) -> List[Dict]:
+        """
+        Build chat messages with the static prefix first and the per-call payload last
+        
+        Args:
+            instructions: Static task instructions
+            payload: Per-call text (content to summarize, themes, ...)
+            
+        Returns:
+            Chat completion messages
         """
-        # Prepare content for summarization
-        content_text = f"""
-        Title: {content.get('title', '')}
-        Description: {content.get('description', '')}
-        Source: {content.get('source', '')}
-        URL: {content.get('url', '')}
+        return [
+            {"role": "system", "content": self.system_prefix},
+            {"role": "system", "content": instructions},
+            {"role": "user", "content": payload}
+        ]
+    
+    def _summary_messages(self, content: Dict) -> List[Dict]:
         """
+        Build the chat messages for summarizing one piece of content
+        
+        Args:
+            content: Prepared content dictionary (see prepare_content)
+            
+        Returns:
+            Chat completion messages
+        """
+        content_text = (
+            f"Title: {content.get('title', '')}\n"
+            f"Description: {content.get('description', '')}\n"
+            f"Source: {content.get('source', '')}\n"
+            f"URL: {content.get('url', '')}"
+        )
         
         if content.get('content'):
             content_text += f"\nContent: {content['content']}"
         
-        prompt = f"""
-        You are FitBUX's financial content summarizer. Follow the brand voice guidelines below:
-
-        {self.brand_guidelines}
-
-        Summarize the following financial content in 2-3 sentences for young professionals (20-40 years old).
-        Use FitBUX's Innocent Everyman voice: calm, trustworthy, educational, and empowering.
-        Focus on what this means for their personal finances and why it matters.
-        Always end with either a lesson, next step, or feeling of progress.
-
-        Content to summarize:
-        {content_text}
+        return self._messages(SUMMARY_INSTRUCTIONS, content_text)
+    
+    def _estimate_tokens(self, messages: List[Dict]) -> int:
+        """Prompt token count, plus a few tokens of per-message overhead"""
+        return sum(count_tokens(message['content']) for message in messages) + 4 * len(messages)
+    
+    def _request_summary(self, content: Dict) -> Optional[str]:
         """
+        Ask the model to summarize a single piece of content
         
+        Args:
+            content: Prepared content dictionary
+            
+        Returns:
+            Summary string in FitBUX voice, or None if the call failed
+        """
         try:
+            started = time.monotonic()
             response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are FitBUX's financial content summarizer. Always use the Innocent Everyman voice: calm, trustworthy, educational, and empowering."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=200,
+                model=SUMMARY_MODEL,
+                messages=self._summary_messages(content),
+                max_tokens=SUMMARY_MAX_TOKENS_PER_ITEM,
                 temperature=0.6
             )
+            self.usage.record('summary', response, time.monotonic() - started)
             
             return response.choices[0].message.content.strip()
             
         except Exception as e:
             print(f"Error summarizing content: {e}")
-            return f"Important financial update from {content.get('source', 'Unknown')}: {content.get('title', 'No title available')}"
+            return None
+    
+    def summarize_content(self, content: Dict) -> str:
+        """
+        Summarize a single piece of content using FitBUX's brand voice
+        
+        Args:
+            content: Dictionary containing title, description, url, source, etc.
+            
+        Returns:
+            Summary string in FitBUX voice
+        """
+        content = prepare_content(content)
+        return self._request_summary(content) or self._fallback_summary(content)
+    
+    async def _summarize_content_async(self, client: openai.AsyncOpenAI, semaphore: asyncio.Semaphore,
+                                       content: Dict) -> Optional[str]:
+        """
+        Summarize one piece of content with the async client
+        
+        Args:
+            client: Async OpenAI client
+            semaphore: Bounds the number of completions in flight
+            content: Prepared content dictionary
+            
+        Returns:
+            Summary string in FitBUX voice, or None if the call failed
+        """
+        messages = self._summary_messages(content)
+        
+        async with semaphore:
+            # Wait for both the request and the token budget
+            delay = self.rate_limiter.reserve(self._estimate_tokens(messages) + SUMMARY_MAX_TOKENS_PER_ITEM)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            
+            try:
+                started = time.monotonic()
+                response = await client.chat.completions.create(
+                    model=SUMMARY_MODEL,
+                    messages=messages,
+                    max_tokens=SUMMARY_MAX_TOKENS_PER_ITEM,
+                    temperature=0.6
+                )
+                self.usage.record('summary', response, time.monotonic() - started)
+                
+                return response.choices[0].message.content.strip()
+                
+            except Exception as e:
+                print(f"Error summarizing content: {e}")
+                return None
+    
+    async def _request_summaries_async(self, contents: List[Dict]) -> List[Optional[str]]:
+        """Summarize prepared content concurrently; None marks items the model failed on"""
+        semaphore = asyncio.Semaphore(SUMMARY_MAX_CONCURRENCY)
+        
+        # A client per event loop; its connection pool can't outlive the loop
+        async with openai.AsyncOpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL) as client:
+            return await asyncio.gather(
+                *(self._summarize_content_async(client, semaphore, content) for content in contents)
+            )
+    
+    async def summarize_all_async(self, contents: List[Dict]) -> List[str]:
+        """
+        Summarize all content concurrently
+        
+        Args:
+            contents: Content dictionaries to summarize
+            
+        Returns:
+            Summaries in the same order as contents
+        """
+        contents = [prepare_content(content) for content in contents]
+        summaries = await self._request_summaries_async(contents)
+        return [summary or self._fallback_summary(content) for content, summary in zip(contents, summaries)]
+    
+    def _request_batch(self, contents: List[Dict]) -> List[Optional[str]]:
+        """
+        Summarize several pieces of content with one completion
+        
+        The model returns a JSON object of summaries keyed by item ID. Items
+        whose summary is missing or malformed are re-requested one by one.
+        
+        Args:
+            contents: Prepared content dictionaries
+            
+        Returns:
+            Summaries in the same order as contents (None where the model failed)
+        """
+        items = []
+        for index, content in enumerate(contents):
+            item = {
+                'id': str(index),
+                'title': content.get('title', ''),
+                'description': content.get('description', ''),
+                'source': content.get('source', ''),
+                'url': content.get('url', '')
+            }
+            if content.get('content'):
+                item['content'] = content['content']
+            items.append(item)
+        
+        summaries = {}
+        try:
+            started = time.monotonic()
+            response = self.client.chat.completions.create(
+                model=SUMMARY_MODEL,
+                messages=self._messages(BATCH_SUMMARY_INSTRUCTIONS, json.dumps(items, ensure_ascii=False)),
+                max_tokens=SUMMARY_MAX_TOKENS_PER_ITEM * len(contents),
+                temperature=0.6,
+                response_format={"type": "json_object"}
+            )
+            self.usage.record('batch', response, time.monotonic() - started)
+            
+            summaries = json.loads(response.choices[0].message.content).get('summaries', {})
+            if not isinstance(summaries, dict):
+                summaries = {}
+                
+        except Exception as e:
+            print(f"Error summarizing batch of {len(contents)} items: {e}")
+        
+        results = []
+        retried = 0
+        for item, content in zip(items, contents):
+            summary = summaries.get(item['id'])
+            if isinstance(summary, str) and summary.strip() and len(summary) <= SUMMARY_MAX_LENGTH:
+                results.append(summary.strip())
+            else:
+                retried += 1
+                results.append(self._request_summary(content))
+        
+        if retried:
+            print(f"  Re-requested {retried} of {len(contents)} batched summaries individually")
+        
+        return results
+    
+    def summarize_batch(self, contents: List[Dict]) -> List[str]:
+        """
+        Summarize several pieces of content with one completion
+        
+        Args:
+            contents: Content dictionaries to summarize
+            
+        Returns:
+            Summaries in the same order as contents
+        """
+        contents = [prepare_content(content) for content in contents]
+        return [summary or self._fallback_summary(content)
+                for content, summary in zip(contents, self._request_batch(contents))]
+    
+    def _summary_cache_key(self, content: Dict) -> str:
+        """Cache key for an item's summary"""
+        text = '\x1f'.join(str(content.get(field) or '') for field in ('title', 'description', 'content'))
+        return self.summary_cache.make_key('summary', text, SUMMARY_MODEL, self.summary_prompt_hash)
+    
+    def summarize_all(self, contents: List[Dict]) -> List[str]:
+        """
+        Summarize all content, reusing cached summaries where possible
+        
+        Args:
+            contents: Content dictionaries to summarize
+            
+        Returns:
+            Summaries in the same order as contents
+        """
+        # Plain text within the token budgets; raw HTML never reaches the model
+        return self._summarize_prepared([prepare_content(content) for content in contents])
+    
+    def _summarize_prepared(self, contents: List[Dict]) -> List[str]:
+        """Summarize prepared content (see summarize_all), reusing cached summaries where possible"""
+        keys = [self._summary_cache_key(content) for content in contents]
+        summaries = [None] * len(contents)
+        
+        missing = []
+        local = 0
+        for index, (content, key) in enumerate(zip(contents, keys)):
+            if self._use_fast_path(content):
+                summaries[index] = self._fallback_summary(content)
+                local += 1
+                continue
+            summaries[index] = self.summary_cache.get(key)
+            if summaries[index] is None:
+                missing.append(index)
+        
+        if local:
+            print(f"  Summarized {local} items locally (fast path)")
+        
+        generated = self._generate_summaries([contents[index] for index in missing], [keys[index] for index in missing])
+        
+        for index, summary in zip(missing, generated):
+            # Items the model failed on get the local summary, which is not cached so they're retried next time
+            if summary is None:
+                summaries[index] = self._fallback_summary(contents[index])
+                continue
+            summaries[index] = summary
+            tokens = self._estimate_tokens(self._summary_messages(contents[index])) + len(summary) // 4
+            self.summary_cache.put(keys[index], summary, tokens=tokens)
+        
+        return summaries
+    
+    def _use_batch_api(self) -> bool:
+        """Whether this run should go through the Batch API"""
+        if SUMMARY_MODE == 'batch_api':
+            return True
+        if not BATCH_API_ON_WEEKENDS:
+            return False
+        now = datetime.now(pytz.timezone(SCHEDULE_CONFIG['weekends']['timezone']))
+        return now.weekday() >= 5
+    
+    def _summarize_with_batch_api(self, contents: List[Dict], keys: List[str]) -> List[Optional[str]]:
+        """
+        Summarize content through the Batch API, finishing late items synchronously
+        
+        Args:
+            contents: Prepared content dictionaries
+            keys: Summary cache key for each item
+            
+        Returns:
+            Summaries in the same order as contents (None where the model failed)
+        """
+        try:
+            results = BatchApiSummarizer(self).summarize(contents, keys)
+        except Exception as e:
+            print(f"Error using the Batch API: {e}")
+            results = {}
+        
+        # Earlier runs' batches may hold items outside this run; cache them for later
+        for key, summary in results.items():
+            if key not in keys:
+                self.summary_cache.put(key, summary)
+        
+        # One synchronous summary per late key, shared by every item with that key
+        late = {}
+        for index, key in enumerate(keys):
+            if key not in results:
+                late.setdefault(key, index)
+        if late:
+            print(f"  Summarizing {len(late)} items without the Batch API")
+        late_summaries = dict(zip(late, self._summarize_in_batches([contents[index] for index in late.values()])))
+        
+        return [results[key] if key in results else late_summaries[key] for key in keys]
+    
+    def _summarize_in_batches(self, contents: List[Dict]) -> List[Optional[str]]:
+        """Summarize content SUMMARY_BATCH_SIZE items per completion (None where the model failed)"""
+        summaries = []
+        for start in range(0, len(contents), SUMMARY_BATCH_SIZE):
+            summaries.extend(self._request_batch(contents[start:start + SUMMARY_BATCH_SIZE]))
+        return summaries
+    
+    def _generate_summaries(self, contents: List[Dict], keys: List[str]) -> List[Optional[str]]:
+        """
+        Summarize content using the configured SUMMARY_MODE
+        
+        Args:
+            contents: Prepared content dictionaries
+            keys: Summary cache key for each item
+            
+        Returns:
+            Summaries in the same order as contents, with None for items the
+            model failed on (the caller substitutes a local summary)
+        """
+        if not contents:
+            return []
+        
+        if self._use_batch_api():
+            return self._summarize_with_batch_api(contents, keys)
+        
+        if SUMMARY_MODE == 'async':
+            return asyncio.run(self._request_summaries_async(contents))
+        
+        if SUMMARY_MODE != 'batched':
+            return [self._request_summary(content) for content in contents]
+        
+        return self._summarize_in_batches(contents)
     
     def create_fitbux_perspective(self, all_content: List[Dict]) -> str:
         """
@@ -88,49 +443,38 @@ class AISummarizer:
         Returns:
             FitBUX perspective summary
         """
-        # Extract key themes from content
-        themes = []
+        # Extract key themes from content (one pass per item over all theme terms)
+        themes = set()
         for content in all_content:
-            title = content.get('title', '').lower()
-            description = content.get('description', '').lower()
-            
-            if any(keyword in title or keyword in description for keyword in ['student loan', 'pslf', 'forgiveness']):
-                themes.append('student loans')
-            elif any(keyword in title or keyword in description for keyword in ['inflation', 'cost', 'price']):
-                themes.append('inflation')
-            elif any(keyword in title or keyword in description for keyword in ['housing', 'home', 'mortgage']):
-                themes.append('housing')
-            elif any(keyword in title or keyword in description for keyword in ['credit', 'debt', 'payment']):
-                themes.append('credit and debt')
+            themes.update(THEME_MATCHER.matched_topics(content.get('title', ''), content.get('description', '')))
         
         # Create perspective prompt
-        themes_text = ', '.join(set(themes)) if themes else 'general financial topics'
+        themes_text = ', '.join(topic for topic in THEME_MATCHER.topics if topic in themes) if themes else 'general financial topics'
         
-        prompt = f"""
-        You are FitBUX's financial perspective writer. Follow the brand voice guidelines:
-
-        {self.brand_guidelines}
-
-        Write a 3-5 sentence summary of today's financial landscape for young professionals (20-40).
-        The main themes today are: {themes_text}
+        # Reuse the perspective for the rest of the day while the themes are unchanged; the
+        # themes are coarse, so a longer-lived entry would repeat the same paragraph for weeks
+        today = datetime.now(pytz.timezone(SCHEDULE_CONFIG['weekdays']['timezone'])).strftime('%Y-%m-%d')
+        cache_key = self.summary_cache.make_key('perspective', f"{today}\x1f{themes_text}", SUMMARY_MODEL,
+                                                self.perspective_prompt_hash)
+        cached = self.summary_cache.get(cache_key)
+        if cached:
+            return cached
         
-        Use FitBUX's Innocent Everyman voice: calm, trustworthy, educational, and empowering.
-        Acknowledge any concerns but provide reassurance and direction.
-        End with a sense of progress or next steps.
-        """
+        messages = self._messages(PERSPECTIVE_INSTRUCTIONS, f"The main themes today are: {themes_text}")
         
         try:
+            started = time.monotonic()
             response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are FitBUX's financial perspective writer. Always use the Innocent Everyman voice."},
-                    {"role": "user", "content": prompt}
-                ],
+                model=SUMMARY_MODEL,
+                messages=messages,
                 max_tokens=300,
                 temperature=0.7
             )
+            self.usage.record('perspective', response, time.monotonic() - started)
             
-            return response.choices[0].message.content.strip()
+            perspective = response.choices[0].message.content.strip()
+            self.summary_cache.put(cache_key, perspective, tokens=self._estimate_tokens(messages) + len(perspective) // 4)
+            return perspective
             
         except Exception as e:
             print(f"Error creating FitBUX perspective: {e}")
@@ -153,18 +497,32 @@ class AISummarizer:
         if studentaid_content:
             all_content.extend(studentaid_content)
         
+        # Plain text within the token budgets, prepared once for both the gate and the model
+        prepared = [prepare_content(content) for content in all_content]
+        
+        # Only the items the digest will render are worth summarizing
+        selected = list(range(len(all_content)))
+        if RELEVANCE_GATE:
+            selected = self.relevance_gate.select_indices(prepared, DIGEST_MAX_ITEMS)
+        
         # Summarize each piece of content
         summarized_content = []
-        for content in all_content:
-            summary = self.summarize_content(content)
+        summaries = self._summarize_prepared([prepared[index] for index in selected])
+        for index, summary in zip(selected, summaries):
+            content = all_content[index]
             content['fitbux_summary'] = summary
             summarized_content.append(content)
         
         # Create FitBUX perspective
         fitbux_perspective = self.create_fitbux_perspective(all_content)
         
+        self.summary_cache.save()
+        self.summary_cache.print_stats()
+        self.usage.print_report()
+        
         return {
             'content': summarized_content,
             'fitbux_perspective': fitbux_perspective,
-            'total_items': len(all_content)
+            'total_items': len(all_content),
+            'selected_items': len(summarized_content)
         }
@@ -0,0 +1,247 @@
+"""
+OpenAI Batch API mode for runs that aren't latency-sensitive
+
+All summarization requests are written to one JSONL file and submitted as
+a batch (at a lower price than synchronous calls). The batch is polled for
+at most BATCH_API_MAX_WAIT_MINUTES; one still running then is cancelled,
+so it isn't billed on top of the synchronous calls the caller makes for
+its items. Submitted batches are recorded before waiting, so if a run is
+stopped mid-wait a later run collects the results instead of resubmitting.
+A later run checks those batches once without waiting and submits whatever
+they don't cover straight away. Request IDs are summary cache keys, so
+results are merged back into items by key.
+"""
+import json
+import os
+import time
+from datetime import datetime
+from typing import List, Dict
+from openai.types.chat import ChatCompletion
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import *
+
+TERMINAL_STATUSES = {'completed', 'failed', 'expired', 'cancelled'}
+
+
+class BatchApiSummarizer:
+    def __init__(self, summarizer, state_file: str = BATCH_API_STATE_FILE,
+                 input_file: str = BATCH_API_INPUT_FILE):
+        """
+        Args:
+            summarizer: AISummarizer providing the client, prompts and usage tracking
+            state_file: Where the pending batch is recorded
+            input_file: Where the JSONL request file is written
+        """
+        self.summarizer = summarizer
+        self.client = summarizer.client
+        self.state_file = state_file
+        self.input_file = input_file
+        self.poll_interval = BATCH_API_POLL_SECONDS
+        self.max_wait = BATCH_API_MAX_WAIT_MINUTES * 60
+
+    def _load_state(self) -> List[Dict]:
+        """Load the pending batches"""
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+            except (json.JSONDecodeError, FileNotFoundError):
+                return []
+            # Older state files held a single batch
+            if 'batch_id' in state:
+                return [state]
+            return state.get('batches', [])
+        return []
+
+    def _save_state(self, pending: List[Dict]):
+        """Record the pending batches, or clear the file once none are left"""
+        try:
+            if not pending:
+                if os.path.exists(self.state_file):
+                    os.remove(self.state_file)
+                return
+            with open(self.state_file, 'w', encoding='utf-8') as f:
+                json.dump({'batches': pending}, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            print(f"Error saving batch state: {e}")
+
+    def _write_requests(self, contents: List[Dict], keys: List[str]):
+        """Write one chat completion request per item to the JSONL input file"""
+        with open(self.input_file, 'w', encoding='utf-8') as f:
+            for content, key in zip(contents, keys):
+                request = {
+                    'custom_id': key,
+                    'method': 'POST',
+                    'url': '/v1/chat/completions',
+                    'body': {
+                        'model': SUMMARY_MODEL,
+                        'messages': self.summarizer._summary_messages(content),
+                        'max_tokens': SUMMARY_MAX_TOKENS_PER_ITEM,
+                        'temperature': 0.6
+                    }
+                }
+                f.write(json.dumps(request, ensure_ascii=False) + '\n')
+
+    def submit(self, contents: List[Dict], keys: List[str]) -> Dict:
+        """
+        Upload the requests and create a batch
+
+        Args:
+            contents: Prepared content dictionaries
+            keys: Request ID (summary cache key) for each item
+
+        Returns:
+            The batch state to record
+        """
+        self._write_requests(contents, keys)
+
+        with open(self.input_file, 'rb') as f:
+            input_file = self.client.files.create(file=f, purpose='batch')
+
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint='/v1/chat/completions',
+            completion_window='24h'
+        )
+
+        state = {
+            'batch_id': batch.id,
+            'input_file_id': input_file.id,
+            'custom_ids': list(keys),
+            'submitted_at': datetime.now().isoformat()
+        }
+        print(f"  Submitted batch {batch.id} with {len(keys)} summarization requests")
+        return state
+
+    def wait(self, batch_id: str, deadline: float):
+        """
+        Poll a batch until it finishes or the deadline passes
+
+        Args:
+            batch_id: Batch to poll
+            deadline: time.monotonic() value to stop polling at
+
+        Returns:
+            The last retrieved batch
+        """
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            if batch.status in TERMINAL_STATUSES or time.monotonic() >= deadline:
+                return batch
+            time.sleep(min(self.poll_interval, max(0, deadline - time.monotonic())))
+
+    def cancel(self, batch_id: str) -> bool:
+        """
+        Cancel a batch that is still running
+
+        Args:
+            batch_id: Batch to cancel
+
+        Returns:
+            True if the cancellation was accepted
+        """
+        try:
+            self.client.batches.cancel(batch_id)
+            return True
+        except Exception as e:
+            print(f"  Error cancelling batch {batch_id}: {e}")
+            return False
+
+    def collect(self, batch) -> Dict[str, str]:
+        """
+        Read the summaries from a finished batch
+
+        Args:
+            batch: Batch with status 'completed'
+
+        Returns:
+            Dictionary of request ID to summary (failed requests are left out)
+        """
+        summaries = {}
+        if not batch.output_file_id:
+            return summaries
+
+        output = self.client.files.content(batch.output_file_id).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            try:
+                result = json.loads(line)
+                response = result.get('response') or {}
+                if response.get('status_code') != 200:
+                    continue
+                completion = ChatCompletion.model_validate(response['body'])
+                self.summarizer.usage.record('batch_api', completion, 0.0)
+                summary = (completion.choices[0].message.content or '').strip()
+                if summary:
+                    summaries[result['custom_id']] = summary
+            except (ValueError, KeyError, IndexError) as e:
+                print(f"Skipping malformed batch result: {e}")
+
+        return summaries
+
+    def _finish(self, batch, summaries: Dict[str, str]) -> bool:
+        """Collect a batch's results if it has finished; returns whether it has"""
+        if batch.status not in TERMINAL_STATUSES:
+            return False
+        if batch.status == 'completed':
+            summaries.update(self.collect(batch))
+        else:
+            print(f"  Batch {batch.id} ended with status {batch.status}")
+        return True
+
+    def summarize(self, contents: List[Dict], keys: List[str]) -> Dict[str, str]:
+        """
+        Summarize items through the Batch API, collecting pending batches first
+
+        Args:
+            contents: Prepared content dictionaries
+            keys: Request ID (summary cache key) for each item
+
+        Returns:
+            Dictionary of request ID to summary for the requests that finished
+            in time, including those of earlier runs' batches (items sharing a
+            key share its summary); the rest are left to the caller, and the
+            batches holding them are cancelled
+        """
+        deadline = time.monotonic() + self.max_wait
+        summaries = {}
+
+        # Items with the same text share a key, and a batch rejects repeated custom_ids
+        unique = {}
+        for content, key in zip(contents, keys):
+            unique.setdefault(key, content)
+
+        # Earlier runs' batches are checked once; a stale one must not hold up this run
+        pending = []
+        for state in self._load_state():
+            batch = self.client.batches.retrieve(state['batch_id'])
+            if not self._finish(batch, summaries):
+                pending.append(state)
+
+        remaining = [key for key in unique if key not in summaries]
+        waiting = [state for state in pending if set(state['custom_ids']) & set(remaining)]
+        pending = [state for state in pending if state not in waiting]
+        if waiting:
+            print(f"  Resuming {len(waiting)} pending batch(es)")
+
+        covered = set(key for state in waiting for key in state['custom_ids'])
+        uncovered = [key for key in remaining if key not in covered]
+        if uncovered:
+            waiting.append(self.submit([unique[key] for key in uncovered], uncovered))
+        self._save_state(pending + waiting)
+
+        # Only batches holding this run's items are waited on. The caller summarizes
+        # whatever is late synchronously, so a late batch is cancelled rather than
+        # left to finish and be billed for items that are already done
+        for state in waiting:
+            batch = self.wait(state['batch_id'], deadline)
+            if self._finish(batch, summaries):
+                continue
+            print(f"  Batch {batch.id} still {batch.status} at the deadline; cancelling it")
+            if not self.cancel(batch.id):
+                pending.append(state)
+
+        self._save_state(pending)
+        return summaries
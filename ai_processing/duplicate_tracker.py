@@ -1,16 +1,25 @@
 """
 Duplicate tracking system to avoid repetitive content
+
+Items seen in a run are staged in memory and only written by commit(),
+which the curator calls once the digest has been sent, so a run that
+fails after filtering doesn't mark its items as already sent.
 """
 import json
 import os
 from datetime import datetime, timedelta
 from typing import List, Dict, Set
 import hashlib
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import *
+from common.keyword_matcher import FINANCIAL_TERM_MATCHER
 
 class DuplicateTracker:
-    def __init__(self, storage_file: str = "content_history.json"):
+    def __init__(self, storage_file: str = CONTENT_HISTORY_FILE):
         self.storage_file = storage_file
         self.content_history = self._load_history()
+        self.staged = {}
     
     def _load_history(self) -> Dict:
         """Load content history from file"""
@@ -22,14 +31,23 @@ class DuplicateTracker:
                 return {}
         return {}
     
-    def _save_history(self):
+    def _save_history(self, history: Dict):
         """Save content history to file"""
         try:
             with open(self.storage_file, 'w', encoding='utf-8') as f:
-                json.dump(self.content_history, f, indent=2, ensure_ascii=False)
+                json.dump(history, f, indent=2, ensure_ascii=False)
         except Exception as e:
             print(f"Error saving content history: {e}")
     
+    def commit(self):
+        """Merge the items seen during this run into the file on disk"""
+        if not self.staged:
+            return
+        history = self._load_history()
+        history.update(self.staged)
+        self._save_history(history)
+        self.staged = {}
+    
     def _generate_content_hash(self, content: Dict) -> str:
         """
         Generate a hash for content to detect duplicates
@@ -125,16 +143,15 @@ class DuplicateTracker:
             # Add to filtered list
             filtered_content.append(content)
             
-            # Update history
-            self.content_history[content_hash] = {
+            # Update history (staged until commit)
+            entry = {
                 'title': title,
                 'url': content.get('url', ''),
                 'source': content.get('source', ''),
                 'last_seen': datetime.now().isoformat()
             }
-        
-        # Save updated history
-        self._save_history()
+            self.content_history[content_hash] = entry
+            self.staged[content_hash] = entry
         
         return filtered_content
     
@@ -153,17 +170,9 @@ class DuplicateTracker:
         
         for content_hash, data in self.content_history.items():
             if datetime.fromisoformat(data['last_seen']) > cutoff_date:
-                title = data.get('title', '').lower()
-                
                 # Extract key financial terms
-                financial_terms = [
-                    'student loan', 'pslf', 'forgiveness', 'inflation', 
-                    'housing', 'credit', 'debt', 'investment', 'budget',
-                    'retirement', 'tax', 'mortgage', 'refinance'
-                ]
-                
-                for term in financial_terms:
-                    if term in title and term not in recent_topics:
+                for term in FINANCIAL_TERM_MATCHER.matched_terms(data.get('title', '')):
+                    if term not in recent_topics:
                         recent_topics.append(term)
         
         return recent_topics
@@ -177,13 +186,14 @@ class DuplicateTracker:
         """
         cutoff_date = datetime.now() - timedelta(days=days_back)
         
-        # Create new history with only recent entries
-        new_history = {}
-        for content_hash, data in self.content_history.items():
-            if datetime.fromisoformat(data['last_seen']) > cutoff_date:
-                new_history[content_hash] = data
-        
-        self.content_history = new_history
-        self._save_history()
+        # Keep only recent entries, leaving staged items out of the file until commit
+        self.content_history = {
+            content_hash: data for content_hash, data in self.content_history.items()
+            if datetime.fromisoformat(data['last_seen']) > cutoff_date
+        }
+        self._save_history({
+            content_hash: data for content_hash, data in self._load_history().items()
+            if datetime.fromisoformat(data['last_seen']) > cutoff_date
+        })
         
         print(f"Cleaned up content history. Removed entries older than {days_back} days.")
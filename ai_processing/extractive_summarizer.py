@@ -0,0 +1,117 @@
+"""
+Local extractive summarizer (TF-IDF sentence vectors ranked with TextRank)
+
+Used when the OpenAI API is unavailable and as a fast path for items that
+don't need an LLM, so a summary costs milliseconds and no API fees.
+"""
+import re
+from typing import List, Dict
+import numpy as np
+
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"\'(])')
+WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9'\-]*")
+# Curly apostrophes (as in "don’t") would otherwise split words into fragments
+APOSTROPHES = str.maketrans({'\u2019': "'", '\u2018': "'"})
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'been', 'but', 'by', 'can', 'for', 'from', 'has', 'have',
+    'he', 'her', 'his', 'i', 'if', 'in', 'into', 'is', 'it', 'its', 'more', 'my', 'no', 'not', 'of', 'on',
+    'or', 'our', 'she', 'so', 'than', 'that', 'the', 'their', 'them', 'there', 'they', 'this', 'to', 'up',
+    'was', 'we', 'were', 'what', 'when', 'which', 'who', 'will', 'with', 'would', 'you', 'your'
+}
+
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split plain text into sentences"""
+    return [sentence.strip() for sentence in SENTENCE_SPLIT.split(text) if sentence.strip()]
+
+
+def tokenize(sentence: str) -> List[str]:
+    """Lowercase content words of a sentence"""
+    words = WORD_PATTERN.findall(sentence.lower().translate(APOSTROPHES))
+    return [word for word in words if len(word) > 1 and word not in STOPWORDS]
+
+
+def rank_sentences(sentences: List[str]) -> np.ndarray:
+    """
+    Score sentences by TextRank centrality over TF-IDF cosine similarity
+
+    Args:
+        sentences: Sentences of one document
+
+    Returns:
+        Score per sentence
+    """
+    tokens = [tokenize(sentence) for sentence in sentences]
+    vocabulary = {word: index for index, word in enumerate(sorted({word for words in tokens for word in words}))}
+    n = len(sentences)
+    if not vocabulary:
+        return np.ones(n) / n
+
+    # Term counts: one row per sentence
+    counts = np.zeros((n, len(vocabulary)))
+    for row, words in enumerate(tokens):
+        np.add.at(counts[row], [vocabulary[word] for word in words], 1)
+
+    document_frequency = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + n) / (1 + document_frequency)) + 1
+    vectors = counts * idf
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0.0)
+
+    # Row-normalize into a transition matrix; isolated sentences link uniformly
+    row_sums = similarity.sum(axis=1, keepdims=True)
+    transition = np.divide(similarity, row_sums, out=np.full_like(similarity, 1.0 / n), where=row_sums > 0)
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(MAX_ITERATIONS):
+        updated = (1 - DAMPING) / n + DAMPING * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            scores = updated
+            break
+        scores = updated
+
+    return scores
+
+
+def summarize_text(text: str, max_sentences: int = 2) -> str:
+    """
+    Pick the most central sentences of a text, in their original order
+
+    Args:
+        text: Plain text
+        max_sentences: Number of sentences to keep
+
+    Returns:
+        Extractive summary (the text itself if it is already short enough)
+    """
+    sentences = split_sentences(text)
+    if len(sentences) <= max_sentences:
+        return ' '.join(sentences)
+
+    scores = rank_sentences(sentences)
+    # Stable sort keeps earlier sentences ahead on ties
+    top = np.sort(np.argsort(-scores, kind='stable')[:max_sentences])
+    return ' '.join(sentences[index] for index in top)
+
+
+def extractive_summary(content: Dict, max_sentences: int = 2) -> str:
+    """
+    Summarize a content item from its own text
+
+    Args:
+        content: Content dictionary with plain-text description/content
+        max_sentences: Number of sentences to keep
+
+    Returns:
+        Summary text, or an empty string if the item has no body text
+    """
+    text = ' '.join(part for part in (content.get('description'), content.get('content')) if part)
+    return summarize_text(text, max_sentences) if text else ''
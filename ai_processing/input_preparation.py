@@ -0,0 +1,164 @@
+"""
+Input preparation for summarization: HTML stripping and token-budgeted truncation
+
+Scraped descriptions often arrive as raw HTML (feed summaries with markup,
+tracking images and boilerplate). Each item is reduced to plain text and
+cut to a token budget at a sentence boundary, so we don't pay for markup
+and every prompt has a predictable size.
+"""
+import html
+import re
+from typing import Dict, List, Optional
+from lxml import etree, html as lxml_html
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import *
+
+try:
+    import tiktoken
+except ImportError:  # Fall back to a character-based estimate
+    tiktoken = None
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+TAG_HINT = re.compile(r'<[a-zA-Z!/]')
+
+# Elements whose text is never worth summarizing
+DROP_ELEMENTS = '//script | //style | //noscript | //img | //iframe | //form'
+
+# Used when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
+
+_encoding = None
+_encoding_failed = False
+
+
+def _get_encoding():
+    """Load the tokenizer for SUMMARY_MODEL once, or None if unavailable"""
+    global _encoding, _encoding_failed
+
+    if _encoding is None and not _encoding_failed and tiktoken is not None:
+        try:
+            try:
+                _encoding = tiktoken.encoding_for_model(SUMMARY_MODEL)
+            except KeyError:
+                _encoding = tiktoken.get_encoding('o200k_base')
+        except Exception as e:
+            # The encoding files are downloaded on first use and may be unreachable
+            print(f"Tokenizer unavailable, estimating tokens from length: {e}")
+            _encoding_failed = True
+
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens in a text
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Token count (estimated from length if tiktoken is unavailable)
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _cut_to_tokens(text: str, max_tokens: int) -> str:
+    """Hard-cut text to max_tokens (used when a single sentence is over budget)"""
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+def collapse_whitespace(text: str) -> str:
+    """Collapse runs of whitespace into single spaces"""
+    return ' '.join(text.split())
+
+
+def strip_html(text: Optional[str]) -> str:
+    """
+    Convert an HTML fragment to plain text
+
+    Args:
+        text: HTML or plain text
+
+    Returns:
+        Plain text with entities decoded and whitespace collapsed
+    """
+    if not text:
+        return ''
+
+    # Plain text needs no parse, only entity decoding
+    if not TAG_HINT.search(text):
+        return collapse_whitespace(html.unescape(text))
+
+    try:
+        document = lxml_html.fragment_fromstring(text, create_parent='div')
+    except (etree.ParserError, ValueError):
+        return collapse_whitespace(html.unescape(text))
+
+    for element in document.xpath(DROP_ELEMENTS):
+        element.drop_tree()
+
+    # Keep block boundaries from gluing words together
+    for element in document.iter('br', 'p', 'div', 'li', 'tr', 'h1', 'h2', 'h3', 'h4'):
+        element.tail = ' ' + (element.tail or '')
+
+    return collapse_whitespace(document.text_content())
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Truncate text to a token budget, ending at a sentence boundary
+
+    Args:
+        text: Plain text
+        max_tokens: Token budget
+
+    Returns:
+        The text, or its longest leading run of whole sentences within budget
+    """
+    if not text or count_tokens(text) <= max_tokens:
+        return text
+
+    sentences = SENTENCE_END.split(text)
+    kept: List[str] = []
+    used = 0
+
+    for sentence in sentences:
+        # +1 for the space joining sentences back together
+        cost = count_tokens(sentence) + (1 if kept else 0)
+        if used + cost > max_tokens:
+            break
+        kept.append(sentence)
+        used += cost
+
+    if not kept:
+        # The first sentence alone is over budget
+        return _cut_to_tokens(text, max_tokens).rstrip() + '...'
+
+    return ' '.join(kept)
+
+
+def prepare_content(content: Dict) -> Dict:
+    """
+    Clean and budget an item's text fields before it is summarized
+
+    Args:
+        content: Content dictionary from a scraper
+
+    Returns:
+        A copy with plain-text title, description and content within their token budgets
+    """
+    prepared = dict(content)
+    prepared['title'] = strip_html(content.get('title'))
+    prepared['description'] = truncate_to_tokens(strip_html(content.get('description')),
+                                                 SUMMARY_DESCRIPTION_TOKEN_BUDGET)
+    if content.get('content'):
+        prepared['content'] = truncate_to_tokens(strip_html(content['content']), SUMMARY_CONTENT_TOKEN_BUDGET)
+    return prepared
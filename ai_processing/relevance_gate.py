@@ -0,0 +1,100 @@
+"""
+Relevance gate: score items against the FitBUX topic profile before summarization
+
+The digest only renders the top few items, so summarizing everything that
+survives de-duplication wastes calls on off-topic stories. Items and a
+topic profile (built from SEARCH_QUERIES and the brand guidelines) are
+embedded as sparse TF-IDF vectors and ranked by cosine similarity; only
+the top-K go on to the LLM.
+"""
+from typing import List, Dict
+import numpy as np
+from scipy import sparse
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import *
+from ai_processing.extractive_summarizer import tokenize
+
+
+class RelevanceGate:
+    def __init__(self, brand_guidelines: str = '', query_weight: int = RELEVANCE_QUERY_WEIGHT):
+        """
+        Args:
+            brand_guidelines: Brand guidelines text (part of the topic profile)
+            query_weight: How many times search-query terms count relative to guideline terms
+        """
+        self.profile_terms = {}
+        for term in tokenize(' '.join(SEARCH_QUERIES)):
+            self.profile_terms[term] = self.profile_terms.get(term, 0) + query_weight
+        for term in tokenize(brand_guidelines):
+            self.profile_terms[term] = self.profile_terms.get(term, 0) + 1
+
+    def _item_terms(self, content: Dict) -> List[str]:
+        """Terms of a prepared item; the title counts twice"""
+        title_terms = tokenize(content.get('title', ''))
+        return title_terms * 2 + tokenize(content.get('description', '')) + tokenize(content.get('content', '') or '')
+
+    def score(self, contents: List[Dict]) -> np.ndarray:
+        """
+        Cosine similarity of each item to the topic profile
+
+        Args:
+            contents: Prepared content dictionaries (see prepare_content)
+
+        Returns:
+            Score per item (0 for items sharing no terms with the profile)
+        """
+        if not contents:
+            return np.zeros(0)
+
+        documents = [self._item_terms(content) for content in contents]
+        vocabulary = {}
+        rows, cols, values = [], [], []
+
+        # Row 0 is the profile, then one row per item
+        for term, count in self.profile_terms.items():
+            rows.append(0)
+            cols.append(vocabulary.setdefault(term, len(vocabulary)))
+            values.append(count)
+        for row, terms in enumerate(documents, start=1):
+            for term in terms:
+                rows.append(row)
+                cols.append(vocabulary.setdefault(term, len(vocabulary)))
+                values.append(1)
+
+        # Duplicate (row, col) entries are summed into term counts
+        counts = sparse.csr_matrix((values, (rows, cols)), shape=(len(documents) + 1, len(vocabulary)),
+                                   dtype=np.float64)
+
+        document_frequency = np.bincount(counts.indices, minlength=len(vocabulary))
+        idf = np.log((1 + counts.shape[0]) / (1 + document_frequency)) + 1
+        tfidf = counts @ sparse.diags(idf)
+
+        norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        tfidf = sparse.diags(1.0 / norms) @ tfidf
+
+        return np.asarray((tfidf[1:] @ tfidf[0].T).todense()).ravel()
+
+    def select_indices(self, contents: List[Dict], k: int) -> List[int]:
+        """
+        Pick the k most relevant items
+
+        Args:
+            contents: Prepared content dictionaries (see prepare_content)
+            k: Number of items to keep
+
+        Returns:
+            Indices of the selected items, in their original order
+        """
+        if len(contents) <= k:
+            return list(range(len(contents)))
+
+        scores = self.score(contents)
+        # Stable sort so equally relevant items keep their original precedence
+        keep = np.sort(np.argsort(-scores, kind='stable')[:k])
+
+        dropped = len(contents) - k
+        print(f"  Relevance gate: kept {k} of {len(contents)} items, skipped {dropped} lower-ranked items")
+        return keep.tolist()
@@ -0,0 +1,138 @@
+"""
+Persistent cache of generated summaries
+
+Entries are keyed on a hash of the item's text together with the model
+and the full prompt text (system prefix with the brand guidelines, plus
+the task instructions), so editing any of those invalidates old summaries
+automatically. Entries expire after a TTL and the least
+recently used ones are evicted once the cache is full.
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import *
+
+
+def hash_text(*parts: str) -> str:
+    """Stable hash of one or more strings"""
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+class SummaryCache:
+    def __init__(self, storage_file: str = SUMMARY_CACHE_FILE, ttl_days: int = SUMMARY_CACHE_TTL_DAYS,
+                 max_entries: int = SUMMARY_CACHE_MAX_ENTRIES):
+        self.storage_file = storage_file
+        self.ttl = timedelta(days=ttl_days)
+        self.max_entries = max_entries
+        self.entries = self._load_cache()
+        self.updated = {}
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+        self.lock = threading.Lock()
+
+    def _load_cache(self) -> Dict:
+        """Load cached summaries from file"""
+        if os.path.exists(self.storage_file):
+            try:
+                with open(self.storage_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, FileNotFoundError):
+                return {}
+        return {}
+
+    def _is_expired(self, entry: Dict) -> bool:
+        """Check whether an entry is past its TTL"""
+        return datetime.now() - datetime.fromisoformat(entry['created_at']) > self.ttl
+
+    def make_key(self, kind: str, text: str, model: str, prompt_hash: str) -> str:
+        """
+        Build a cache key
+
+        Args:
+            kind: What is being generated (e.g. 'summary', 'perspective')
+            text: The input the output depends on
+            model: Model name
+            prompt_hash: Hash of every static prompt text used to generate it
+
+        Returns:
+            Cache key
+        """
+        return hash_text(kind, model, prompt_hash, text)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Get a cached output, counting the hit or miss
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            The cached text, or None if missing or expired
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if not entry or self._is_expired(entry):
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.tokens_saved += entry.get('tokens', 0)
+            entry['last_used'] = datetime.now().isoformat()
+            self.updated[key] = entry
+            return entry['text']
+
+    def put(self, key: str, text: str, tokens: int = 0):
+        """
+        Cache an output
+
+        Args:
+            key: Cache key from make_key
+            text: Generated text
+            tokens: Tokens it cost to generate (reported as saved on later hits)
+        """
+        now = datetime.now().isoformat()
+        with self.lock:
+            entry = {'text': text, 'tokens': tokens, 'created_at': now, 'last_used': now}
+            self.entries[key] = entry
+            self.updated[key] = entry
+
+    def save(self):
+        """Merge this run's entries into the file, dropping expired and least recently used ones"""
+        try:
+            stored = self._load_cache()
+            stored.update(self.updated)
+
+            live = {key: entry for key, entry in stored.items() if not self._is_expired(entry)}
+            if len(live) > self.max_entries:
+                newest = sorted(live.items(), key=lambda item: item[1]['last_used'], reverse=True)
+                live = dict(newest[:self.max_entries])
+
+            with open(self.storage_file, 'w', encoding='utf-8') as f:
+                json.dump(live, f, indent=2, ensure_ascii=False)
+
+            self.entries = live
+            self.updated = {}
+        except Exception as e:
+            print(f"Error saving summary cache: {e}")
+
+    def get_stats(self) -> Dict:
+        """Get hit/miss counts and tokens saved for this run"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'tokens_saved': self.tokens_saved
+        }
+
+    def print_stats(self):
+        """Print hit rate and tokens saved for this run"""
+        stats = self.get_stats()
+        print(f"  Summary cache: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']:.0%} hit rate), ~{stats['tokens_saved']} tokens saved")
@@ -0,0 +1,55 @@
+"""
+Per-run token and latency accounting for OpenAI calls
+"""
+import threading
+from typing import Dict
+
+
+class UsageTracker:
+    def __init__(self):
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def record(self, kind: str, response, seconds: float):
+        """
+        Record one completion's token usage and latency
+
+        Args:
+            kind: Call type (e.g. 'summary', 'batch', 'perspective')
+            response: Chat completion response (its usage may be missing)
+            seconds: Wall-clock time the call took
+        """
+        usage = getattr(response, 'usage', None)
+        details = getattr(usage, 'prompt_tokens_details', None)
+
+        with self.lock:
+            stats = self.calls.setdefault(kind, {
+                'calls': 0, 'prompt_tokens': 0, 'cached_tokens': 0, 'completion_tokens': 0, 'seconds': 0.0
+            })
+            stats['calls'] += 1
+            stats['prompt_tokens'] += getattr(usage, 'prompt_tokens', 0) or 0
+            stats['cached_tokens'] += getattr(details, 'cached_tokens', 0) or 0
+            stats['completion_tokens'] += getattr(usage, 'completion_tokens', 0) or 0
+            stats['seconds'] += seconds
+
+    def get_totals(self) -> Dict:
+        """Sum usage over every call type"""
+        totals = {'calls': 0, 'prompt_tokens': 0, 'cached_tokens': 0, 'completion_tokens': 0, 'seconds': 0.0}
+        with self.lock:
+            for stats in self.calls.values():
+                for field in totals:
+                    totals[field] += stats[field]
+        return totals
+
+    def print_report(self):
+        """Print tokens, prompt-cache reuse and latency per call type for this run"""
+        print("\n  OpenAI usage:")
+        rows = list(self.calls.items()) + [('total', self.get_totals())]
+        for kind, stats in rows:
+            if not stats['calls']:
+                continue
+            cached_share = stats['cached_tokens'] / stats['prompt_tokens'] if stats['prompt_tokens'] else 0.0
+            print(f"    {kind:12} {stats['calls']:3} calls  "
+                  f"prompt {stats['prompt_tokens']:6} (cached {stats['cached_tokens']:6}, {cached_share:4.0%})  "
+                  f"completion {stats['completion_tokens']:5}  "
+                  f"{stats['seconds']:6.1f}s total, {stats['seconds'] / stats['calls']:4.1f}s avg")
@@ -0,0 +1 @@
+# Common utilities package
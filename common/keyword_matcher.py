@@ -0,0 +1,111 @@
+"""
+Compiled keyword / topic matching shared by the scrapers and AI processing
+
+Each term set is compiled once into a single alternation regex, so every
+text is scanned in one pass no matter how many terms or topics there are.
+"""
+import re
+from typing import List, Dict
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import *
+
+
+class KeywordMatcher:
+    def __init__(self, topics: Dict[str, List[str]]):
+        """
+        Compile topic term lists into one matcher
+
+        Matching is case-insensitive substring matching, the same as
+        `keyword in text.lower()`.
+
+        Args:
+            topics: Mapping of topic name to the terms that indicate it
+        """
+        self.topics = list(topics)
+        self.term_order = []
+        self.term_topics = {}
+
+        for topic, terms in topics.items():
+            for term in terms:
+                term = term.lower()
+                if term not in self.term_topics:
+                    self.term_order.append(term)
+                    self.term_topics[term] = []
+                if topic not in self.term_topics[term]:
+                    self.term_topics[term].append(topic)
+
+        # The scan reports one (longest) term per start position, so a match also
+        # implies every shorter term contained in it (e.g. "financial aid" -> "aid")
+        self.implied_terms = {
+            term: [other for other in self.term_order if other in term]
+            for term in self.term_order
+        }
+
+        alternation = '|'.join(re.escape(term) for term in sorted(self.term_order, key=len, reverse=True))
+        self.pattern = re.compile(alternation) if alternation else None
+        # Zero-width lookahead tries every start position, so overlapping terms
+        # ("student loan" / "loan forgiveness") are each reported
+        self.overlapping_pattern = re.compile(f'(?=({alternation}))') if alternation else None
+
+    @classmethod
+    def from_terms(cls, terms: List[str]) -> 'KeywordMatcher':
+        """Build a matcher where every term is its own topic"""
+        return cls({term: [term] for term in terms})
+
+    def matches(self, *texts: str) -> bool:
+        """
+        Check whether any term appears in any of the texts
+
+        Args:
+            *texts: Texts to search (e.g. title and description)
+
+        Returns:
+            True if at least one term matched
+        """
+        if self.pattern is None:
+            return False
+        return self.pattern.search('\n'.join(texts).lower()) is not None
+
+    def matched_terms(self, *texts: str) -> List[str]:
+        """
+        Find every term that appears in the texts, including overlapping ones
+
+        Args:
+            *texts: Texts to search
+
+        Returns:
+            Matched terms, in the order they were declared
+        """
+        if self.overlapping_pattern is None:
+            return []
+
+        found = set()
+        for match in self.overlapping_pattern.finditer('\n'.join(texts).lower()):
+            found.update(self.implied_terms[match.group(1)])
+
+        return [term for term in self.term_order if term in found]
+
+    def matched_topics(self, *texts: str) -> List[str]:
+        """
+        Classify texts into every topic whose terms appear in them
+
+        Args:
+            *texts: Texts to search
+
+        Returns:
+            Matched topics, in the order they were declared
+        """
+        found = set()
+        for term in self.matched_terms(*texts):
+            found.update(self.term_topics[term])
+
+        return [topic for topic in self.topics if topic in found]
+
+
+# Shared matchers, compiled once at import
+DISCUSSION_MATCHER = KeywordMatcher.from_terms(DISCUSSION_KEYWORDS)
+STUDENT_AID_MATCHER = KeywordMatcher.from_terms(STUDENT_AID_KEYWORDS)
+THEME_MATCHER = KeywordMatcher(PERSPECTIVE_THEMES)
+FINANCIAL_TERM_MATCHER = KeywordMatcher.from_terms(FINANCIAL_TOPIC_TERMS)
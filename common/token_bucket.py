@@ -0,0 +1,73 @@
+"""
+Token-bucket rate limiting shared by the scrapers and AI processing
+"""
+import threading
+import time
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Token bucket that refills continuously
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens the bucket can hold
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """
+        Take tokens from the bucket without blocking
+
+        Args:
+            amount: Number of tokens to take
+
+        Returns:
+            Seconds the caller must wait before proceeding
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+
+            # Going negative queues the caller behind earlier reservations
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self, amount: float = 1.0):
+        """Block until the requested tokens are available"""
+        delay = self.reserve(amount)
+        if delay > 0:
+            time.sleep(delay)
+
+
+class RequestTokenRateLimiter:
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        """
+        Pace API calls against both a request and a token budget per minute
+
+        Args:
+            requests_per_minute: Allowed requests per minute
+            tokens_per_minute: Allowed (estimated) tokens per minute
+        """
+        self.requests = TokenBucket(rate=requests_per_minute / 60.0, capacity=requests_per_minute)
+        self.tokens = TokenBucket(rate=tokens_per_minute / 60.0, capacity=tokens_per_minute)
+
+    def reserve(self, tokens: float) -> float:
+        """
+        Reserve one request and its tokens without blocking
+
+        Args:
+            tokens: Estimated tokens the request will use (prompt plus completion)
+
+        Returns:
+            Seconds the caller must wait before sending the request
+        """
+        return max(self.requests.reserve(1), self.tokens.reserve(tokens))
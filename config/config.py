@@ -9,12 +9,17 @@ load_dotenv(dotenv_path=os.path.join(os.path.dirname(os.path.dirname(__file__)),
 
 # API Keys
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # Optional; e.g. a proxy or local stand-in server
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
 REDDIT_CLIENT_ID = os.getenv("REDDIT_CLIENT_ID")
 REDDIT_CLIENT_SECRET = os.getenv("REDDIT_CLIENT_SECRET")
 REDDIT_USER_AGENT = os.getenv("REDDIT_USER_AGENT", "FitBUX News Curator 1.0")
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
+# Where run state (caches, cursors, quota ledger, ...) is kept between runs. Lambda's
+# code directory is read-only, so default to /tmp there; STATE_DIR overrides it
+STATE_DIR = os.getenv("STATE_DIR", "/tmp" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else ".")
+
 # Email Configuration
 EMAIL_USER = os.getenv("EMAIL_USER")
 EMAIL_PASS = os.getenv("EMAIL_PASS")
@@ -35,6 +40,35 @@ NEWS_SOURCES = [
     "nerdwallet.com"
 ]
 
+# HTTP Settings
+HTTP_USER_AGENT = "FitBUX News Curator 1.0"
+HTTP_CACHE_FILE = os.path.join(STATE_DIR, "http_cache.json")  # ETag / Last-Modified validators for polled URLs
+HTTP_CONNECT_TIMEOUT = 5  # Seconds
+HTTP_READ_TIMEOUT = 30  # Seconds
+HTTP_MAX_RETRIES = 3  # Retries for connection errors, 429 and 5xx responses (read timeouts are not retried)
+HTTP_BACKOFF_FACTOR = 0.5  # Exponential backoff: 0.5s, 1s, 2s, ...
+HTTP_MAX_BACKOFF = 30  # Cap on any single retry wait, including Retry-After
+HTTP_POOL_CONNECTIONS = 10  # Number of hosts to keep connection pools for
+HTTP_POOL_MAXSIZE = 4  # Maximum open connections per host
+
+# RSS Feeds
+RSS_FEEDS = [
+    "https://feeds.bloomberg.com/markets/news.rss",
+    "https://www.forbes.com/business/feed/",  # Forbes business news
+    "https://www.cnbc.com/id/100003114/device/rss/rss.html",
+    "https://feeds.marketwatch.com/marketwatch/topstories/",
+    "https://feeds.finance.yahoo.com/rss/2.0/headline",  # Yahoo Finance (may be rate limited)
+]
+
+# RSS Fetching (feeds are fetched in parallel, spaced per host)
+RSS_MAX_WORKERS = 5
+RSS_DEFAULT_HOST_INTERVAL = 1.0  # Seconds between requests to the same host
+RSS_HOST_INTERVALS = {
+    "feeds.finance.yahoo.com": 3.0
+}
+FEED_PARSE_PROCESS_THRESHOLD = 8  # Parse in a process pool once this many feeds are configured
+FEED_PARSE_PROCESSES = 4
+
 # Reddit Subreddits to Monitor
 REDDIT_SUBREDDITS = [
     "pslf",
@@ -42,12 +76,37 @@ REDDIT_SUBREDDITS = [
     "studentloans"
 ]
 
+# Fetch all subreddits with one multireddit listing (r/a+b+c) instead of one call each
+REDDIT_COMBINED_LISTING = True
+REDDIT_COMBINED_LISTING_LIMIT = 100  # Posts read from the combined listing (100 = one API page)
+REDDIT_COMBINED_MIN_POSTS = 2  # Subreddits with fewer posts in the combined listing are fetched separately
+
+# Reddit backend: "praw" (synchronous) or "async" (JSON listing calls fanned out over a bounded thread pool)
+REDDIT_BACKEND = "praw"
+# Listing requests in flight at once. The async backend gets its own connection and
+# thread pools of this size; subreddits beyond it wait for a free slot, so keep it at
+# or above len(REDDIT_SUBREDDITS) for stage time to stay flat as subreddits are added
+REDDIT_ASYNC_CONCURRENCY = 16
+REDDIT_RATELIMIT_MIN_REMAINING = 5  # Pause until the rate-limit window resets below this
+
 # YouTube Channels to Monitor
 YOUTUBE_CHANNELS = [
     "UCStudentLoanPlanner",  # Student Loan Planner
     "UCStanleyTate"  # Stanley Tate
 ]
 
+# How channels are polled: "api" (playlistItems, 1 quota unit per channel) or
+# "feed" (public uploads Atom feed with conditional GET, no quota)
+YOUTUBE_CHANNEL_BACKEND = "api"
+YOUTUBE_FEED_URL = "https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
+
+# Channel metadata (uploads playlist ID, title) is cached between runs
+YOUTUBE_CHANNEL_CACHE_FILE = os.path.join(STATE_DIR, "youtube_channels.json")
+YOUTUBE_CHANNEL_CACHE_TTL_DAYS = 30
+YOUTUBE_CHANNEL_NEGATIVE_TTL_DAYS = 7  # Retry unresolvable channel entries weekly
+
+VIDEO_DETAILS_BATCH_SIZE = 50  # Video IDs per videos().list call (API maximum)
+
 # Additional YouTube search terms for specific experts
 YOUTUBE_EXPERT_SEARCHES = [
     "Adam Minsky student loans",
@@ -56,6 +115,19 @@ YOUTUBE_EXPERT_SEARCHES = [
     "student loan forgiveness 2025"
 ]
 
+# General YouTube topic searches
+YOUTUBE_TOPIC_SEARCHES = [
+    "student loan forgiveness 2025",
+    "PSLF public service loan forgiveness",
+    "personal finance tips 2025",
+    "inflation impact young adults"
+]
+
+# YouTube Data API quota
+YOUTUBE_DAILY_QUOTA = 10000  # Units per day, reset at midnight Pacific time
+YOUTUBE_QUOTA_RESERVE = 500  # Units kept back for cheap channel/video list calls
+YOUTUBE_QUOTA_FILE = os.path.join(STATE_DIR, "youtube_quota.json")
+
 # Search Queries for News
 SEARCH_QUERIES = [
     "financial news for young professionals",
@@ -68,6 +140,44 @@ SEARCH_QUERIES = [
     "student loan consolidation"
 ]
 
+# NewsAPI Request Planning
+NEWSAPI_MAX_QUERY_LENGTH = 500  # NewsAPI limit on the q parameter
+NEWSAPI_PAGE_SIZE = 100  # NewsAPI maximum pageSize (the Developer plan serves only the first page)
+NEWSAPI_CACHE_FILE = os.path.join(STATE_DIR, "newsapi_cache.json")
+NEWSAPI_CACHE_TTL_HOURS = 2  # Single-day windows: shorter than the run spacing, so scheduled runs see fresh news
+# Multi-day windows (e.g. the 7-day StudentAid search) are reused until their end date rolls over
+
+# Page change detection (StudentAid data center)
+PAGE_FINGERPRINT_FILE = os.path.join(STATE_DIR, "page_fingerprints.json")
+STUDENTAID_MAX_PAGE_BYTES = 2 * 1024 * 1024  # Stop reading the data-center page after this many bytes
+
+# Circuit Breakers (skip endpoints that keep failing)
+CIRCUIT_BREAKER_FILE = os.path.join(STATE_DIR, "circuit_breakers.json")
+CIRCUIT_BREAKER_WINDOW = 10  # Recent calls considered per endpoint
+CIRCUIT_BREAKER_MIN_CALLS = 3  # Calls needed before the breaker can open
+CIRCUIT_BREAKER_FAILURE_RATE = 0.5  # Failure rate that opens the breaker
+CIRCUIT_BREAKER_COOLDOWN_MINUTES = 360  # Wait before probing an open endpoint again
+
+# Incremental Fetching (only process entries newer than the last run)
+INCREMENTAL_FETCH = True
+SOURCE_CURSOR_FILE = os.path.join(STATE_DIR, "source_cursors.json")
+CONTENT_HISTORY_FILE = os.path.join(STATE_DIR, "content_history.json")  # Items already sent (duplicate tracking)
+
+# Keyword / Topic Matching (case-insensitive substring terms)
+DISCUSSION_KEYWORDS = ['question', 'help', 'advice', 'what', 'how', 'why', 'should']
+STUDENT_AID_KEYWORDS = ['student', 'loan', 'aid', 'financial aid', 'pslf', 'forgiveness']
+PERSPECTIVE_THEMES = {
+    "student loans": ['student loan', 'pslf', 'forgiveness'],
+    "inflation": ['inflation', 'cost', 'price'],
+    "housing": ['housing', 'home', 'mortgage'],
+    "credit and debt": ['credit', 'debt', 'payment']
+}
+FINANCIAL_TOPIC_TERMS = [
+    'student loan', 'pslf', 'forgiveness', 'inflation',
+    'housing', 'credit', 'debt', 'investment', 'budget',
+    'retirement', 'tax', 'mortgage', 'refinance'
+]
+
 # Scheduling Configuration
 SCHEDULE_CONFIG = {
     "weekdays": {
@@ -81,9 +191,52 @@ SCHEDULE_CONFIG = {
 }
 
 # Content Filtering
+DIGEST_MAX_ITEMS = 10  # Items rendered in the email digest
+RELEVANCE_GATE = True  # Only summarize the DIGEST_MAX_ITEMS items most relevant to the FitBUX topic profile
+RELEVANCE_QUERY_WEIGHT = 3  # Weight of SEARCH_QUERIES terms relative to brand-guideline terms in the profile
 MAX_ARTICLES_PER_RUN = 10
 MAX_REDDIT_POSTS = 5
 MAX_YOUTUBE_VIDEOS = 3
 
+# Parallel Source Fetching (per-source deadlines in seconds)
+SOURCE_TIMEOUTS = {
+    "news": 120,
+    "reddit": 60,
+    "youtube": 90,
+    "studentaid": 60
+}
+DEFAULT_SOURCE_TIMEOUT = 120
+
+# AI Summarization
+SUMMARY_MODEL = "gpt-4o-mini"
+# "batched" (several items per completion), "async" (concurrent per-item calls),
+# "batch_api" (OpenAI Batch API, submitted and polled) or "single" (one call at a time)
+SUMMARY_MODE = "batched"
+SUMMARY_BATCH_SIZE = 8  # Items per batched completion
+SUMMARY_MAX_TOKENS_PER_ITEM = 200
+SUMMARY_DESCRIPTION_TOKEN_BUDGET = 300  # Input tokens kept per item description (cut at a sentence end)
+SUMMARY_CONTENT_TOKEN_BUDGET = 400  # Input tokens kept per item body (e.g. Reddit selftext)
+INGEST_MAX_TEXT_CHARS = 4000  # Scrapers keep this much Reddit selftext / YouTube description (well above the token budgets)
+# Fast path: use the local extractive summarizer instead of the LLM for these content types
+SUMMARY_FAST_PATH = True
+SUMMARY_FAST_PATH_CONTENT_TYPES = ["studentaid_data_update"]  # Low-priority types that never go to the LLM
+SUMMARY_MAX_LENGTH = 1200  # Characters; longer batched summaries are treated as malformed
+SUMMARY_MAX_CONCURRENCY = 8  # Completions in flight at once in async mode
+SUMMARY_CACHE_FILE = os.path.join(STATE_DIR, "summary_cache.json")
+SUMMARY_CACHE_TTL_DAYS = 14
+SUMMARY_CACHE_MAX_ENTRIES = 2000
+# Batch API mode (cheaper, not latency-sensitive). Set BATCH_API_ON_WEEKENDS=true in the
+# environment (e.g. the Lambda's environment variables) to use it for weekend runs regardless
+# of SUMMARY_MODE; weekend runs then wait up to BATCH_API_MAX_WAIT_MINUTES for the batch
+BATCH_API_ON_WEEKENDS = os.getenv("BATCH_API_ON_WEEKENDS", "false").lower() in ("1", "true", "yes")
+BATCH_API_POLL_SECONDS = 30
+# Then cancel the batch and summarize its items synchronously. Keep the whole run well
+# inside the host's limit (AWS Lambda stops an invocation after 15 minutes)
+BATCH_API_MAX_WAIT_MINUTES = 5
+BATCH_API_STATE_FILE = os.path.join(STATE_DIR, "summary_batch_state.json")
+BATCH_API_INPUT_FILE = os.path.join(STATE_DIR, "summary_batch_requests.jsonl")
+OPENAI_REQUESTS_PER_MINUTE = 500
+OPENAI_TOKENS_PER_MINUTE = 200000
+
 # Duplicate Detection (in days)
 DUPLICATE_CHECK_DAYS = 3
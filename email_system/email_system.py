@@ -49,7 +49,7 @@ TOP FINANCIAL STORIES FOR YOUNG PROFESSIONALS
 """
         
         # Add each content item
-        for i, content in enumerate(processed_content['content'][:10], 1):
+        for i, content in enumerate(processed_content['content'][:DIGEST_MAX_ITEMS], 1):
             title = content.get('title', 'No Title')
             source = content.get('source', 'Unknown Source')
             url = content.get('url', '#')
@@ -15,6 +15,7 @@ from scrapers.news_scraper import NewsScraper
 from scrapers.reddit_scraper import RedditScraper
 from scrapers.youtube_scraper import YouTubeScraper
 from scrapers.studentaid_scraper import StudentAidScraper
+from scrapers.stage_executor import ParallelStageExecutor
 from ai_processing.ai_summarizer import AISummarizer
 from ai_processing.duplicate_tracker import DuplicateTracker
 from email_system.email_system import EmailSystem
@@ -46,29 +47,30 @@ def run_news_curator():
         print("Initializing email system...")
         email_system = EmailSystem()
         
-        # Fetch content from all sources
+        # Fetch content from all sources in parallel; a slow source only loses its own results
         print("\nFetching content from all sources...")
-        
-        # Get news articles
-        print("  Fetching financial news...")
-        news_articles = news_scraper.get_all_news()
+        stage_executor = ParallelStageExecutor()
+        results = stage_executor.run({
+            'news': news_scraper.get_all_news,
+            'reddit': reddit_scraper.get_all_reddit_content,
+            'youtube': youtube_scraper.get_all_youtube_content,
+            'studentaid': studentaid_scraper.get_all_studentaid_content
+        })
+        
+        news_articles = results['news']
         print(f"    Found {len(news_articles)} news articles")
         
-        # Get Reddit posts
-        print("  Fetching Reddit discussions...")
-        reddit_posts = reddit_scraper.get_all_reddit_content()
+        reddit_posts = results['reddit']
         print(f"    Found {len(reddit_posts)} Reddit posts")
         
-        # Get YouTube videos
-        print("  Fetching YouTube videos...")
-        youtube_videos = youtube_scraper.get_all_youtube_content()
+        youtube_videos = results['youtube']
         print(f"    Found {len(youtube_videos)} YouTube videos")
         
-        # Get StudentAid.gov content
-        print("  Fetching StudentAid.gov updates...")
-        studentaid_content = studentaid_scraper.get_all_studentaid_content()
+        studentaid_content = results['studentaid']
         print(f"    Found {len(studentaid_content)} StudentAid articles")
         
+        stage_executor.print_report()
+        
         # Combine all content
         all_content = news_articles + reddit_posts + youtube_videos + studentaid_content
         print(f"\nTotal content collected: {len(all_content)} items")
@@ -102,6 +104,20 @@ def run_news_curator():
         if email_success:
             print("Email digest sent successfully!")
             
+            # Only now record this run's items as sent, so a failed run offers them again
+            duplicate_tracker.commit()
+            
+            # Move the source cursors past this run's items. A stage that timed out
+            # or failed may still be running, and its results were never used, so skip it
+            scrapers = {
+                'news': news_scraper,
+                'youtube': youtube_scraper,
+                'studentaid': studentaid_scraper
+            }
+            for name, scraper in scrapers.items():
+                if stage_executor.succeeded(name):
+                    scraper.commit_progress()
+            
             # Print summary
             current_time = datetime.now(pytz.timezone('US/Central')).strftime("%Y-%m-%d %H:%M:%S %Z")
             print(f"\nDigest Summary:")
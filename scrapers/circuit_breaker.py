@@ -0,0 +1,157 @@
+"""
+Persistent per-endpoint circuit breakers
+
+Endpoints that keep failing are skipped immediately instead of costing a
+timeout on every run, and are probed again after a cool-down.
+"""
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import *
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is skipped because the endpoint's breaker is open"""
+
+
+class CircuitBreakerRegistry:
+    def __init__(self, storage_file: str = CIRCUIT_BREAKER_FILE):
+        self.storage_file = storage_file
+        self.breakers = self._load_breakers()
+        self.updated = {}
+        self.probing = set()
+        self.lock = threading.Lock()
+
+    def _load_breakers(self) -> Dict:
+        """Load breaker state from file"""
+        if os.path.exists(self.storage_file):
+            try:
+                with open(self.storage_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, FileNotFoundError):
+                return {}
+        return {}
+
+    def _save_breaker(self, endpoint: str, breaker: Dict):
+        """
+        Merge the breakers this registry changed into the file on disk (callers hold self.lock)
+
+        Every scraper has its own registry on the same file, so each save
+        re-applies all of this registry's endpoints; one lost to another
+        registry's concurrent save is restored on the next one.
+        """
+        self.updated[endpoint] = breaker
+        try:
+            stored = self._load_breakers()
+            stored.update(self.updated)
+            with open(self.storage_file, 'w', encoding='utf-8') as f:
+                json.dump(stored, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            print(f"Error saving circuit breakers: {e}")
+
+    def _get_breaker(self, endpoint: str) -> Dict:
+        """Get the breaker for an endpoint, creating a closed one if needed"""
+        if endpoint not in self.breakers:
+            self.breakers[endpoint] = {'state': CLOSED, 'outcomes': [], 'opened_at': None}
+        return self.breakers[endpoint]
+
+    def allow(self, endpoint: str) -> bool:
+        """
+        Check whether a call to an endpoint should be attempted
+
+        An open breaker past its cool-down turns half-open and lets a
+        single probe call through.
+
+        Args:
+            endpoint: Endpoint key (usually the URL)
+
+        Returns:
+            True if the call should go ahead
+        """
+        with self.lock:
+            breaker = self._get_breaker(endpoint)
+
+            if breaker['state'] == CLOSED:
+                return True
+
+            if breaker['state'] == OPEN:
+                cooldown = timedelta(minutes=CIRCUIT_BREAKER_COOLDOWN_MINUTES)
+                if datetime.now() - datetime.fromisoformat(breaker['opened_at']) < cooldown:
+                    return False
+                breaker['state'] = HALF_OPEN
+                self._save_breaker(endpoint, breaker)
+
+            # Half-open: allow one probe per process at a time
+            if endpoint in self.probing:
+                return False
+            self.probing.add(endpoint)
+            return True
+
+    def record_success(self, endpoint: str):
+        """Record a successful call; a successful probe closes the breaker"""
+        with self.lock:
+            breaker = self._get_breaker(endpoint)
+            self.probing.discard(endpoint)
+
+            if breaker['state'] != CLOSED:
+                print(f"Circuit closed for {endpoint}")
+                breaker.update({'state': CLOSED, 'outcomes': [], 'opened_at': None})
+
+            breaker['outcomes'] = (breaker['outcomes'] + [True])[-CIRCUIT_BREAKER_WINDOW:]
+            self._save_breaker(endpoint, breaker)
+
+    def record_failure(self, endpoint: str):
+        """Record a failed call; too many recent failures open the breaker"""
+        with self.lock:
+            breaker = self._get_breaker(endpoint)
+            self.probing.discard(endpoint)
+            breaker['outcomes'] = (breaker['outcomes'] + [False])[-CIRCUIT_BREAKER_WINDOW:]
+
+            failures = breaker['outcomes'].count(False)
+            failure_rate = failures / len(breaker['outcomes'])
+
+            if breaker['state'] == HALF_OPEN or (
+                len(breaker['outcomes']) >= CIRCUIT_BREAKER_MIN_CALLS
+                and failure_rate >= CIRCUIT_BREAKER_FAILURE_RATE
+            ):
+                if breaker['state'] != OPEN:
+                    print(f"Circuit opened for {endpoint} ({failures}/{len(breaker['outcomes'])} recent calls failed)")
+                breaker['state'] = OPEN
+                breaker['opened_at'] = datetime.now().isoformat()
+
+            self._save_breaker(endpoint, breaker)
+
+    def call(self, endpoint: str, func: Callable, *args, **kwargs):
+        """
+        Call a function through the endpoint's breaker
+
+        Args:
+            endpoint: Endpoint key (usually the URL)
+            func: Function performing the request
+            *args, **kwargs: Arguments for func
+
+        Returns:
+            Whatever func returns
+
+        Raises:
+            CircuitOpenError: If the breaker is open and the call was skipped
+        """
+        if not self.allow(endpoint):
+            raise CircuitOpenError(f"circuit open for {endpoint}, skipping until cool-down ends")
+
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record_failure(endpoint)
+            raise
+
+        self.record_success(endpoint)
+        return result
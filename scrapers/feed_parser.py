@@ -0,0 +1,193 @@
+"""
+Streaming RSS/Atom parser built on lxml iterparse
+
+Only the first few qualifying entries of each feed are used, so parsing
+stops as soon as enough have been read. Feeds lxml can't handle fall back
+to feedparser, and many feeds can be parsed across a process pool.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import List, Dict, Optional, Callable
+import feedparser
+from lxml import etree
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import *
+from scrapers.timestamps import parse_timestamp
+
+ENTRY_TAGS = {'item', 'entry'}
+FEED_TAGS = {'channel', 'feed'}
+
+
+def _local_name(tag) -> str:
+    """Strip the XML namespace from a tag name"""
+    if not isinstance(tag, str):
+        return ''
+    return tag.rsplit('}', 1)[-1]
+
+
+def _parse_date(value: str):
+    """Parse an RFC-822 or ISO-8601 date into a UTC struct_time"""
+    parsed = parse_timestamp(value)
+    return parsed.utctimetuple() if parsed else None
+
+
+def _element_to_entry(element) -> Dict:
+    """Convert an <item> or <entry> element into an entry dictionary"""
+    entry = {'id': '', 'title': '', 'summary': '', 'link': '', 'published': ''}
+
+    for child in element:
+        name = _local_name(child.tag)
+        text = ''.join(child.itertext()).strip()
+
+        if name == 'title':
+            entry['title'] = text
+        elif name in ('description', 'summary') or (name in ('content', 'encoded') and not entry['summary']):
+            entry['summary'] = text
+        elif name == 'link':
+            # RSS puts the URL in the text, Atom in href (prefer rel="alternate")
+            href = child.get('href')
+            if href is None:
+                entry['link'] = entry['link'] or text
+            elif child.get('rel', 'alternate') == 'alternate' or not entry['link']:
+                entry['link'] = href
+        elif name in ('guid', 'id'):
+            entry['id'] = text
+        elif name in ('pubDate', 'published', 'date') or (name == 'updated' and not entry['published']):
+            entry['published'] = text
+        elif name == 'videoId':
+            entry['video_id'] = text
+        elif name == 'channelId':
+            entry['channel_id'] = text
+
+    entry['published_parsed'] = _parse_date(entry['published'])
+    return entry
+
+
+def has_title_and_summary(entry: Dict) -> bool:
+    """Default filter: keep entries that can be summarized"""
+    return bool(entry.get('title') and entry.get('summary'))
+
+
+def _parse_with_feedparser(content: bytes, max_items: int, accept: Optional[Callable]) -> Dict:
+    """Fallback for feeds lxml rejects (bad markup, HTML entities, ...)"""
+    feed = feedparser.parse(content)
+
+    entries = []
+    for item in feed.entries:
+        entry = {
+            'id': item.get('id', ''),
+            'title': item.get('title', ''),
+            'summary': item.get('summary', ''),
+            'link': item.get('link', ''),
+            'published': item.get('published', ''),
+            'published_parsed': item.get('published_parsed'),
+        }
+        if item.get('yt_videoid'):
+            entry['video_id'] = item['yt_videoid']
+        if accept is None or accept(entry):
+            entries.append(entry)
+            if len(entries) >= max_items:
+                break
+
+    return {'title': feed.feed.get('title', ''), 'entries': entries}
+
+
+def parse_feed(content: bytes, max_items: int = 5, accept: Optional[Callable] = has_title_and_summary,
+               stop_at_id: Optional[str] = None) -> Dict:
+    """
+    Parse a feed document, stopping once enough entries are found
+
+    Args:
+        content: Raw feed bytes
+        max_items: Stop after this many qualifying entries
+        accept: Predicate an entry must pass to count (must be picklable for process pools)
+        stop_at_id: Stop when reaching this entry ID (e.g. the last one seen on a previous run)
+
+    Returns:
+        Dictionary with the feed 'title' and a list of 'entries'
+    """
+    title = ''
+    entries = []
+    items_seen = 0
+
+    try:
+        context = etree.iterparse(
+            BytesIO(content), events=('end',),
+            resolve_entities=False, no_network=True, remove_comments=True
+        )
+
+        for _, element in context:
+            name = _local_name(element.tag)
+
+            if name == 'title':
+                parent = element.getparent()
+                if parent is not None and _local_name(parent.tag) in FEED_TAGS:
+                    title = ''.join(element.itertext()).strip()
+                continue
+
+            if name not in ENTRY_TAGS:
+                continue
+
+            items_seen += 1
+            entry = _element_to_entry(element)
+
+            # Free the parsed entry and everything before it
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+            if stop_at_id and (entry['id'] or entry['link']) == stop_at_id:
+                break
+
+            if accept is None or accept(entry):
+                entries.append(entry)
+                if len(entries) >= max_items:
+                    break
+
+    except etree.XMLSyntaxError:
+        return _parse_with_feedparser(content, max_items, accept)
+
+    if items_seen == 0:
+        # Not RSS/Atom as lxml sees it; let feedparser have a go
+        return _parse_with_feedparser(content, max_items, accept)
+
+    return {'title': title, 'entries': entries}
+
+
+def _parse_feed_args(args) -> Dict:
+    """Unpack arguments for ProcessPoolExecutor.map"""
+    return parse_feed(*args)
+
+
+def parse_feeds(contents: List[bytes], max_items: int = 5, accept: Optional[Callable] = has_title_and_summary,
+                stop_at_ids: Optional[List[Optional[str]]] = None) -> List[Dict]:
+    """
+    Parse several feeds, using a process pool when there are enough of them
+
+    Args:
+        contents: Raw feed bytes, one per feed
+        max_items: Stop after this many qualifying entries per feed
+        accept: Predicate an entry must pass to count
+        stop_at_ids: Optional per-feed entry ID to stop at
+
+    Returns:
+        Parsed feeds in the same order as contents
+    """
+    stop_at_ids = stop_at_ids or [None] * len(contents)
+    args = [(content, max_items, accept, stop_at_id) for content, stop_at_id in zip(contents, stop_at_ids)]
+
+    if len(contents) >= FEED_PARSE_PROCESS_THRESHOLD:
+        try:
+            # spawn rather than fork: callers may already be running worker threads
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=FEED_PARSE_PROCESSES, mp_context=context) as executor:
+                return list(executor.map(_parse_feed_args, args))
+        except (OSError, NotImplementedError, BrokenProcessPool) as e:
+            # Some hosts (e.g. AWS Lambda) can't start worker processes
+            print(f"Process pool unavailable, parsing feeds inline: {e}")
+
+    return [_parse_feed_args(arg) for arg in args]
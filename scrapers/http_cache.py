@@ -0,0 +1,124 @@
+"""
+Conditional-GET validator cache (ETag / Last-Modified) for polled feeds and pages
+
+Like source cursors, new validators are only written by commit() once the
+digest has been sent; otherwise a failed run would turn the next poll into
+a 304 and its entries would never be seen.
+"""
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+import requests
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import *
+from scrapers.http_transport import http_get
+
+
+class ConditionalGetCache:
+    def __init__(self, storage_file: str = HTTP_CACHE_FILE):
+        self.storage_file = storage_file
+        self.validators = self._load_cache()
+        self.staged = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def _load_cache(self) -> Dict:
+        """Load stored validators from file"""
+        if os.path.exists(self.storage_file):
+            try:
+                with open(self.storage_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, FileNotFoundError):
+                return {}
+        return {}
+
+    def commit(self):
+        """Merge the validators received during this run into the file on disk"""
+        with self.lock:
+            if not self.staged:
+                return
+            try:
+                stored = self._load_cache()
+                stored.update(self.staged)
+                with open(self.storage_file, 'w', encoding='utf-8') as f:
+                    json.dump(stored, f, indent=2, ensure_ascii=False)
+                self.staged = {}
+            except Exception as e:
+                print(f"Error saving HTTP cache: {e}")
+
+    def conditional_headers(self, url: str) -> Dict:
+        """
+        Build If-None-Match / If-Modified-Since headers for a URL
+
+        Args:
+            url: URL about to be requested
+
+        Returns:
+            Dictionary of conditional request headers (empty if never seen)
+        """
+        headers = {}
+        entry = self.validators.get(url, {})
+
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        return headers
+
+    def fetch(self, url: str, headers: Optional[Dict] = None, stream: bool = False) -> Optional[requests.Response]:
+        """
+        GET a URL, sending stored validators
+
+        Args:
+            url: URL to fetch
+            headers: Extra request headers
+            stream: Leave the body unread (read it with read_capped)
+
+        Returns:
+            The response, or None if the server answered 304 Not Modified
+        """
+        request_headers = dict(headers or {})
+        request_headers.update(self.conditional_headers(url))
+
+        response = http_get(url, headers=request_headers, stream=stream)
+
+        if response.status_code == 304:
+            response.close()
+            with self.lock:
+                self.hits += 1
+            return None
+
+        if not response.ok:
+            # A streamed body is never read here, so release the connection before raising
+            response.close()
+        response.raise_for_status()
+
+        with self.lock:
+            self.misses += 1
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            entry = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'checked_at': datetime.now().isoformat()
+            }
+            with self.lock:
+                self.validators[url] = entry
+                self.staged[url] = entry
+
+        return response
+
+    def get_stats(self) -> Dict:
+        """Get hit/miss counts for this run"""
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def print_stats(self, label: str):
+        """Print hit/miss counts for this run"""
+        print(f"  {label} HTTP cache: {self.hits} hits (not modified), {self.misses} misses")
@@ -0,0 +1,121 @@
+"""
+Shared pooled HTTP transport for all scrapers
+
+One requests.Session is shared across scrapers so TCP/TLS connections are
+reused, with bounded exponential-backoff retries for transient failures.
+"""
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import *
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def build_session(pool_maxsize: int = HTTP_POOL_MAXSIZE) -> requests.Session:
+    """
+    Create a session with connection pooling and retries configured
+
+    Most callers should use the shared session from get_session(); a
+    separate session is for callers that need a differently sized pool.
+
+    Args:
+        pool_maxsize: Maximum open connections per host
+
+    Returns:
+        New requests session
+    """
+    # Both the exponential backoff and any server Retry-After delay are capped.
+    # Read timeouts are not retried: a hung host would otherwise cost
+    # (retries + 1) x HTTP_READ_TIMEOUT and overrun the source's stage deadline.
+    # retry_after_max needs urllib3 2.6.3+ (see requirements.txt)
+    retry = Retry(
+        total=HTTP_MAX_RETRIES,
+        read=0,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        backoff_max=HTTP_MAX_BACKOFF,
+        retry_after_max=HTTP_MAX_BACKOFF,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+
+    # pool_maxsize caps connections per host; pool_block makes extra
+    # threads wait for a free connection instead of opening new ones
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=pool_maxsize,
+        pool_block=True,
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['User-Agent'] = HTTP_USER_AGENT
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Get the process-wide shared session
+
+    Returns:
+        Pooled requests session
+    """
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            _session = build_session()
+        return _session
+
+
+def http_get(url: str, **kwargs) -> requests.Response:
+    """
+    GET a URL through the shared session with the configured timeouts
+
+    Args:
+        url: URL to fetch
+        **kwargs: Extra arguments for requests (params, headers, timeout, ...)
+
+    Returns:
+        The response
+    """
+    kwargs.setdefault('timeout', (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
+    return get_session().get(url, **kwargs)
+
+
+def read_capped(response: requests.Response, max_bytes: int, chunk_size: int = 64 * 1024) -> bytes:
+    """
+    Read a streamed response body, stopping after max_bytes
+
+    Args:
+        response: Response fetched with stream=True
+        max_bytes: Maximum number of bytes to keep
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        The body, truncated to max_bytes
+    """
+    chunks = []
+    size = 0
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= max_bytes:
+                print(f"Stopped reading {response.url} at {max_bytes} bytes")
+                break
+    finally:
+        # Closing with the body partly unread drops the connection rather than
+        # reusing it, but frees its pool slot for other requests
+        response.close()
+
+    return b''.join(chunks)[:max_bytes]
@@ -0,0 +1,172 @@
+"""
+NewsAPI query consolidation and response caching
+
+NewsAPI bills every request against the daily quota, so compatible search
+queries are merged into OR-expressions and responses are cached on disk
+for repeated runs over the same date window.
+"""
+import hashlib
+import json
+import os
+import re
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import *
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace and case so equivalent queries share a cache key"""
+    return re.sub(r'\s+', ' ', query).strip().lower()
+
+
+def merge_queries(queries: List[str], max_length: int = NEWSAPI_MAX_QUERY_LENGTH) -> List[str]:
+    """
+    Pack search queries into as few OR-expressions as NewsAPI allows
+
+    Args:
+        queries: Queries that share the same date window and options
+        max_length: Maximum length of a single q parameter
+
+    Returns:
+        List of merged query strings
+    """
+    merged = []
+    current = []
+    seen = set()
+
+    for query in queries:
+        key = normalize_query(query)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+
+        term = f"({query.strip()})"
+        if current and len(" OR ".join(current + [term])) > max_length:
+            merged.append(current)
+            current = []
+        current.append(term)
+
+    if current:
+        merged.append(current)
+
+    # A lone query doesn't need the surrounding parentheses
+    return [" OR ".join(terms) if len(terms) > 1 else terms[0][1:-1] for terms in merged]
+
+
+class NewsApiResponseCache:
+    def __init__(self, storage_file: str = NEWSAPI_CACHE_FILE, ttl_hours: float = NEWSAPI_CACHE_TTL_HOURS):
+        self.storage_file = storage_file
+        self.ttl = timedelta(hours=ttl_hours)
+        self.responses = self._load_cache()
+        self.hits = 0
+        self.misses = 0
+
+    def _load_cache(self) -> Dict:
+        """Load cached responses from file"""
+        if os.path.exists(self.storage_file):
+            try:
+                with open(self.storage_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, FileNotFoundError):
+                return {}
+        return {}
+
+    def _save_cache(self):
+        """Save cached responses to file, dropping expired entries"""
+        now = datetime.now()
+        self.responses = {
+            key: entry for key, entry in self.responses.items()
+            if self._expires_at(entry) > now
+        }
+
+        try:
+            with open(self.storage_file, 'w', encoding='utf-8') as f:
+                json.dump(self.responses, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            print(f"Error saving NewsAPI cache: {e}")
+
+    def _expiry_for(self, params: Dict) -> datetime:
+        """
+        Work out when a response for these parameters goes stale
+
+        Single-day windows expire after the TTL. Multi-day windows barely
+        change within a day, so they stay valid until the window's end date
+        rolls over (the dates are part of the cache key anyway).
+
+        Args:
+            params: NewsAPI request parameters
+
+        Returns:
+            Expiry time
+        """
+        now = datetime.now()
+        try:
+            from_date = datetime.strptime(params['from'], '%Y-%m-%d')
+            to_date = datetime.strptime(params['to'], '%Y-%m-%d')
+        except (KeyError, ValueError):
+            return now + self.ttl
+
+        if (to_date - from_date).days > 1:
+            return max(now + self.ttl, to_date + timedelta(days=1))
+        return now + self.ttl
+
+    def _expires_at(self, entry: Dict) -> datetime:
+        """Expiry time of a stored entry (older entries only have cached_at)"""
+        if 'expires_at' in entry:
+            return datetime.fromisoformat(entry['expires_at'])
+        return datetime.fromisoformat(entry['cached_at']) + self.ttl
+
+    def _make_key(self, params: Dict) -> str:
+        """
+        Build a cache key from the request parameters
+
+        Args:
+            params: NewsAPI request parameters (the API key is ignored)
+
+        Returns:
+            Hash string
+        """
+        key_params = {k: v for k, v in params.items() if k != 'apiKey'}
+        key_params['q'] = normalize_query(key_params.get('q', ''))
+        return hashlib.md5(json.dumps(key_params, sort_keys=True).encode()).hexdigest()
+
+    def get(self, params: Dict) -> Optional[List[Dict]]:
+        """
+        Look up a cached response
+
+        Args:
+            params: NewsAPI request parameters
+
+        Returns:
+            Cached articles, or None if missing or expired
+        """
+        entry = self.responses.get(self._make_key(params))
+
+        if entry and self._expires_at(entry) > datetime.now():
+            self.hits += 1
+            return [dict(article) for article in entry['articles']]
+
+        self.misses += 1
+        return None
+
+    def put(self, params: Dict, articles: List[Dict]):
+        """
+        Store a response
+
+        Args:
+            params: NewsAPI request parameters
+            articles: Parsed articles returned for those parameters
+        """
+        self.responses[self._make_key(params)] = {
+            'query': params.get('q', ''),
+            'cached_at': datetime.now().isoformat(),
+            'expires_at': self._expiry_for(params).isoformat(),
+            'articles': articles
+        }
+        self._save_cache()
+
+    def print_stats(self):
+        """Print hit/miss counts for this run"""
+        print(f"  NewsAPI cache: {self.hits} hits, {self.misses} misses (API calls)")
@@ -2,26 +2,40 @@
 News scraping module for financial news sources
 """
 import requests
-import feedparser
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Optional
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.config import *
+from scrapers.rate_limiter import HostRateLimiter
+from scrapers.http_cache import ConditionalGetCache
+from scrapers.http_transport import http_get
+from scrapers.news_query_planner import NewsApiResponseCache, merge_queries
+from scrapers.source_cursors import SourceCursorStore
+from scrapers.feed_parser import parse_feeds
+from scrapers.timestamps import to_epoch, top_k
+from scrapers.circuit_breaker import CircuitBreakerRegistry, CircuitOpenError
 
 class NewsScraper:
     def __init__(self):
         self.news_api_key = NEWS_API_KEY
         self.base_url = "https://newsapi.org/v2/everything"
+        self.rate_limiter = HostRateLimiter(RSS_HOST_INTERVALS, RSS_DEFAULT_HOST_INTERVAL)
+        self.http_cache = ConditionalGetCache()
+        self.newsapi_cache = NewsApiResponseCache()
+        self.cursors = SourceCursorStore()
+        self.breakers = CircuitBreakerRegistry()
         
-    def fetch_news_api_articles(self, query: str, days_back: int = 1) -> List[Dict]:
+    def fetch_news_api_articles(self, query: str, days_back: int = 1, page_size: int = 20) -> List[Dict]:
         """
-        Fetch articles from NewsAPI
+        Fetch articles from NewsAPI, serving repeats in the same window from cache
         
         Args:
             query: Search query for articles
             days_back: How many days back to search
+            page_size: Number of articles to request (capped at NEWSAPI_PAGE_SIZE)
             
         Returns:
             List of article dictionaries
@@ -29,7 +43,7 @@ class NewsScraper:
         if not self.news_api_key:
             print("Warning: NEWS_API_KEY not found. Skipping NewsAPI.")
             return []
-            
+        
         # Calculate date range
         to_date = datetime.now()
         from_date = to_date - timedelta(days=days_back)
@@ -40,81 +54,134 @@ class NewsScraper:
             'to': to_date.strftime('%Y-%m-%d'),
             'language': 'en',
             'sortBy': 'relevancy',
-            'pageSize': 20,
+            'pageSize': min(page_size, NEWSAPI_PAGE_SIZE),
             'apiKey': self.news_api_key
         }
         
+        cached_articles = self.newsapi_cache.get(params)
+        if cached_articles is not None:
+            return cached_articles
+        
         try:
-            response = requests.get(self.base_url, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            
-            articles = []
-            for article in data.get('articles', []):
-                if article.get('title') and article.get('description'):
-                    articles.append({
-                        'title': article['title'],
-                        'description': article['description'],
-                        'url': article['url'],
-                        'source': article['source']['name'],
-                        'published_at': article['publishedAt'],
-                        'content_type': 'news'
-                    })
-            
-            return articles
-            
-        except requests.exceptions.RequestException as e:
+            data = self.breakers.call(self.base_url, self._request_news_api, params)
+        except (requests.exceptions.RequestException, CircuitOpenError) as e:
             print(f"Error fetching from NewsAPI: {e}")
             return []
+        
+        articles = []
+        for article in data.get('articles', []):
+            if article.get('title') and article.get('description'):
+                articles.append({
+                    'title': article['title'],
+                    'description': article['description'],
+                    'url': article['url'],
+                    'source': article['source']['name'],
+                    'published_at': article['publishedAt'],
+                    'published_ts': to_epoch(article['publishedAt']),
+                    'content_type': 'news'
+                })
+        
+        self.newsapi_cache.put(params, articles)
+        return articles
+    
+    def _request_news_api(self, params: Dict) -> Dict:
+        """Send one NewsAPI request and return the decoded JSON"""
+        response = http_get(self.base_url, params=params)
+        response.raise_for_status()
+        return response.json()
+    
+    def fetch_merged_news_api_articles(self, queries: List[str], days_back: int = 1) -> List[Dict]:
+        """
+        Fetch articles for several queries using as few NewsAPI calls as possible
+        
+        Args:
+            queries: Search queries sharing the same date window
+            days_back: How many days back to search
+            
+        Returns:
+            List of article dictionaries
+        """
+        articles = []
+        
+        for merged_query in merge_queries(queries):
+            # Each merged query stands in for several single queries, so ask for
+            # more results, up to the single page NewsAPI serves
+            query_count = merged_query.count(' OR ') + 1
+            articles.extend(self.fetch_news_api_articles(
+                merged_query, days_back=days_back,
+                page_size=min(20 * query_count, NEWSAPI_PAGE_SIZE)
+            ))
+        
+        return articles
     
+    def _download_rss_feed(self, feed_url: str) -> Optional[bytes]:
+        """
+        Download a single RSS feed
+
+        Args:
+            feed_url: URL of the RSS feed
+
+        Returns:
+            Raw feed bytes, or None if unchanged since the last poll or on error
+        """
+        try:
+            # Space out requests to the same host instead of sleeping globally
+            self.rate_limiter.wait(feed_url)
+
+            # Feeds that keep failing are skipped until their cool-down ends
+            response = self.breakers.call(feed_url, self.http_cache.fetch, feed_url)
+
+            # 304 Not Modified: nothing new since the last poll, skip parsing
+            if response is None:
+                return None
+
+            return response.content
+
+        except Exception as e:
+            print(f"Error fetching RSS feed {feed_url}: {e}")
+            return None
+
     def fetch_rss_feeds(self) -> List[Dict]:
         """
         Fetch articles from RSS feeds of financial news sources
+
+        Feeds are downloaded concurrently; the per-host rate limiter keeps
+        rate-limited hosts spaced out without delaying the others. Parsing
+        stops after the first 5 usable entries of each feed.
         """
-        rss_feeds = [
-            "https://feeds.bloomberg.com/markets/news.rss",
-            "https://www.forbes.com/business/feed/",  # Forbes business news
-            "https://www.cnbc.com/id/100003114/device/rss/rss.html",
-            "https://feeds.marketwatch.com/marketwatch/topstories/",
-            "https://feeds.finance.yahoo.com/rss/2.0/headline",  # Yahoo Finance (may be rate limited)
-        ]
-        
         articles = []
-        
-        for feed_url in rss_feeds:
-            try:
-                # Add delay to prevent rate limiting
-                import time
-                time.sleep(3)  # Increased to 3 seconds for better rate limiting
-                
-                feed = feedparser.parse(feed_url)
-                
-                # Check if feed was successfully parsed
-                if hasattr(feed, 'status') and feed.status >= 400:
-                    print(f"RSS feed {feed_url} returned error status: {feed.status}")
-                    continue
-                
-                if not feed.entries:
-                    print(f"No entries found in RSS feed: {feed_url}")
-                    continue
-                
-                for entry in feed.entries[:5]:  # Limit to 5 per feed
-                    if hasattr(entry, 'title') and hasattr(entry, 'summary'):
-                        articles.append({
-                            'title': entry.title,
-                            'description': entry.summary,
-                            'url': entry.link,
-                            'source': feed.feed.get('title', 'RSS Feed'),
-                            'published_at': entry.get('published', ''),
-                            'content_type': 'rss'
-                        })
-                        
-            except Exception as e:
-                print(f"Error parsing RSS feed {feed_url}: {e}")
+
+        with ThreadPoolExecutor(max_workers=max(1, min(RSS_MAX_WORKERS, len(RSS_FEEDS)))) as executor:
+            # map() keeps results in feed order
+            contents = list(executor.map(self._download_rss_feed, RSS_FEEDS))
+
+        downloaded = [(url, content) for url, content in zip(RSS_FEEDS, contents) if content]
+        if not downloaded:
+            return articles
+
+        # Stop parsing each feed at the newest entry seen on a previous run
+        stop_at_ids = [(self.cursors.get(f"rss:{url}") or {}).get('last_id') for url, _ in downloaded]
+        feeds = parse_feeds([content for _, content in downloaded], max_items=5, stop_at_ids=stop_at_ids)
+
+        for (feed_url, _), feed in zip(downloaded, feeds):
+            if not feed['entries']:
+                print(f"No new entries found in RSS feed: {feed_url}")
                 continue
-                
+
+            # Limit to 5 per feed, skipping entries already seen on a previous run
+            for entry in self.cursors.new_feed_entries(f"rss:{feed_url}", feed['entries'], limit=5):
+                articles.append({
+                    'title': entry['title'],
+                    'description': entry['summary'],
+                    'url': entry['link'],
+                    'source': feed['title'] or 'RSS Feed',
+                    'published_at': entry['published'],
+                    'published_ts': to_epoch(entry['published_parsed']),
+                    'content_type': 'rss'
+                })
+
         return articles
-    
+
     def search_adam_minsky_articles(self) -> List[Dict]:
         """
         Search for Adam Minsky articles using multiple approaches
@@ -129,17 +196,15 @@ class NewsScraper:
             '"Adam Minsky" + "student debt"'
         ]
         
-        for query in search_queries:
-            try:
-                # Use NewsAPI to search for these specific queries
-                query_articles = self.fetch_news_api_articles(query, days_back=7)
-                for article in query_articles:
-                    article['content_type'] = 'expert_article'
-                    article['source'] = 'Adam Minsky via ' + article.get('source', 'Unknown')
-                articles.extend(query_articles)
-            except Exception as e:
-                print(f"Error searching for Adam Minsky articles: {e}")
-                continue
+        try:
+            # Use NewsAPI to search for these specific queries (merged into one call)
+            query_articles = self.fetch_merged_news_api_articles(search_queries, days_back=7)
+            for article in query_articles:
+                article['content_type'] = 'expert_article'
+                article['source'] = 'Adam Minsky via ' + article.get('source', 'Unknown')
+            articles.extend(query_articles)
+        except Exception as e:
+            print(f"Error searching for Adam Minsky articles: {e}")
         
         # Approach 2: Direct site searches (if NewsAPI doesn't work)
         if not articles:
@@ -153,34 +218,33 @@ class NewsScraper:
         """
         Fetch news from all sources and combine them
         """
-        all_articles = []
-        
-        # Fetch from NewsAPI for each search query
-        for query in SEARCH_QUERIES:
-            articles = self.fetch_news_api_articles(query)
-            all_articles.extend(articles)
+        # Fetch from NewsAPI, merging the search queries into as few calls as possible
+        news_articles = self.fetch_merged_news_api_articles(SEARCH_QUERIES)
         
         # Fetch from RSS feeds
         rss_articles = self.fetch_rss_feeds()
-        all_articles.extend(rss_articles)
+        self.http_cache.print_stats("RSS")
         
         # Search for Adam Minsky articles
         adam_articles = self.search_adam_minsky_articles()
-        all_articles.extend(adam_articles)
+        self.newsapi_cache.print_stats()
         
-        # Remove duplicates based on URL
+        # Remove duplicates based on URL, keeping each source's articles together
         seen_urls = set()
-        unique_articles = []
-        
-        for article in all_articles:
-            if article['url'] not in seen_urls:
-                seen_urls.add(article['url'])
-                unique_articles.append(article)
-        
-        # Sort by published date (newest first)
-        unique_articles.sort(
-            key=lambda x: x.get('published_at', ''), 
-            reverse=True
-        )
-        
-        return unique_articles[:MAX_ARTICLES_PER_RUN]
+        sources = []
+        
+        for articles in (news_articles, rss_articles, adam_articles):
+            unique_articles = []
+            for article in articles:
+                if article['url'] not in seen_urls:
+                    seen_urls.add(article['url'])
+                    unique_articles.append(article)
+            sources.append(unique_articles)
+        
+        # Keep the newest articles across all sources (published_ts is normalized at ingestion)
+        return top_k(sources, MAX_ARTICLES_PER_RUN)
+    
+    def commit_progress(self):
+        """Save this run's feed cursors and validators (call once the digest is sent)"""
+        self.cursors.commit()
+        self.http_cache.commit()
@@ -0,0 +1,186 @@
+"""
+Change detection for polled web pages using fingerprints of normalized regions
+
+Instead of keyword-matching the whole page, the parts that matter (dataset
+links, dates, headings) are extracted, normalized and hashed. A page only
+counts as updated when one of those fingerprints changes, and the stored
+region contents let us say exactly what was added or removed.
+"""
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from typing import List, Dict, Optional
+from urllib.parse import urljoin, urldefrag
+from lxml import etree, html
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import *
+
+# Links that point at downloadable data or data-center pages
+DATASET_LINK_PATTERN = re.compile(r'(/data-center/|\.(xlsx?|csv|zip|pdf)$)', re.IGNORECASE)
+
+DATE_PATTERN = re.compile(
+    r'\b(?:(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*\.? \d{1,2}, \d{4}'
+    r'|\d{1,2}/\d{1,2}/\d{4}'
+    r'|\d{4}-\d{2}-\d{2})\b'
+)
+
+
+def _normalize_text(text: str) -> str:
+    """Collapse whitespace so re-indented markup doesn't count as a change"""
+    return ' '.join(text.split())
+
+
+def extract_regions(content: bytes, base_url: str = '') -> Dict[str, List[str]]:
+    """
+    Extract the normalized regions of a page that indicate real updates
+
+    Args:
+        content: Raw HTML (may be truncated)
+        base_url: URL the page was fetched from, to make links absolute
+
+    Returns:
+        Dictionary of region name to its sorted, de-duplicated entries
+    """
+    try:
+        document = html.fromstring(content)
+    except (etree.ParserError, ValueError):
+        return {'datasets': [], 'dates': [], 'headings': []}
+
+    for element in document.xpath('//script | //style | //noscript'):
+        element.drop_tree()
+
+    datasets = set()
+    for link in document.xpath('//a[@href]'):
+        href = urldefrag(urljoin(base_url, link.get('href').strip()))[0]
+        if DATASET_LINK_PATTERN.search(href):
+            label = _normalize_text(link.text_content())
+            datasets.add(f"{label} <{href}>" if label else href)
+
+    text = _normalize_text(document.text_content())
+    dates = set(DATE_PATTERN.findall(text))
+
+    headings = {
+        _normalize_text(heading.text_content())
+        for heading in document.xpath('//h1 | //h2 | //h3')
+    }
+    headings.discard('')
+
+    return {
+        'datasets': sorted(datasets),
+        'dates': sorted(dates),
+        'headings': sorted(headings)
+    }
+
+
+def fingerprint_regions(regions: Dict[str, List[str]]) -> Dict[str, str]:
+    """Hash each region's entries"""
+    return {
+        name: hashlib.sha256('\n'.join(entries).encode('utf-8')).hexdigest()
+        for name, entries in regions.items()
+    }
+
+
+class PageChangeDetector:
+    def __init__(self, storage_file: str = PAGE_FINGERPRINT_FILE):
+        self.storage_file = storage_file
+        self.pages = self._load_fingerprints()
+        self.staged = {}
+
+    def _load_fingerprints(self) -> Dict:
+        """Load stored page fingerprints from file"""
+        if os.path.exists(self.storage_file):
+            try:
+                with open(self.storage_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, FileNotFoundError):
+                return {}
+        return {}
+
+    def commit(self):
+        """Merge the fingerprints recorded during this run into the file on disk"""
+        if not self.staged:
+            return
+        try:
+            stored = self._load_fingerprints()
+            stored.update(self.staged)
+            with open(self.storage_file, 'w', encoding='utf-8') as f:
+                json.dump(stored, f, indent=2, ensure_ascii=False)
+            self.staged = {}
+        except Exception as e:
+            print(f"Error saving page fingerprints: {e}")
+
+    def check(self, url: str, content: bytes) -> Optional[Dict[str, Dict[str, List[str]]]]:
+        """
+        Compare a page against its stored fingerprints and stage the new ones
+
+        The first check of a page only records a baseline. New fingerprints
+        are written by commit(), so a change stays reported until a digest
+        including it has been sent.
+
+        Args:
+            url: Page URL
+            content: Raw HTML
+
+        Returns:
+            Changed regions with their 'added' and 'removed' entries, or None
+            if nothing changed (or this was the baseline)
+        """
+        regions = extract_regions(content, base_url=url)
+        fingerprints = fingerprint_regions(regions)
+        previous = self.pages.get(url)
+
+        page = {
+            'fingerprints': fingerprints,
+            'regions': regions,
+            'checked_at': datetime.now().isoformat()
+        }
+
+        if previous is None:
+            print(f"Recorded baseline fingerprint for {url}")
+            self.pages[url] = page
+            self.staged[url] = page
+            return None
+
+        changes = {}
+        for name, digest in fingerprints.items():
+            if previous['fingerprints'].get(name) == digest:
+                continue
+            old_entries = set(previous['regions'].get(name, []))
+            new_entries = set(regions[name])
+            changes[name] = {
+                'added': sorted(new_entries - old_entries),
+                'removed': sorted(old_entries - new_entries)
+            }
+
+        if changes:
+            self.pages[url] = page
+            self.staged[url] = page
+            return changes
+        return None
+
+
+def describe_changes(changes: Dict[str, Dict[str, List[str]]], max_entries: int = 5) -> str:
+    """
+    Summarize region changes in a sentence or two
+
+    Args:
+        changes: Result of PageChangeDetector.check
+        max_entries: Maximum entries listed per region and direction
+
+    Returns:
+        Human-readable description of what changed
+    """
+    parts = []
+    for name, change in changes.items():
+        for direction in ('added', 'removed'):
+            entries = change[direction]
+            if not entries:
+                continue
+            listed = '; '.join(entries[:max_entries])
+            if len(entries) > max_entries:
+                listed += f" (and {len(entries) - max_entries} more)"
+            parts.append(f"{name.capitalize()} {direction}: {listed}.")
+    return ' '.join(parts) or "Page content changed."
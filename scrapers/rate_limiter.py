@@ -0,0 +1,47 @@
+"""
+Per-host token-bucket rate limiting for concurrent scraping
+"""
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlparse
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.token_bucket import TokenBucket
+
+
+class HostRateLimiter:
+    def __init__(self, host_intervals: Optional[Dict[str, float]] = None, default_interval: float = 0.0):
+        """
+        Keep one token bucket per host so slow hosts don't hold up fast ones
+
+        Args:
+            host_intervals: Minimum seconds between requests for specific hosts
+            default_interval: Minimum seconds between requests for any other host
+        """
+        self.host_intervals = host_intervals or {}
+        self.default_interval = default_interval
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def _get_bucket(self, host: str) -> Optional[TokenBucket]:
+        """Get or create the bucket for a host"""
+        interval = self.host_intervals.get(host, self.default_interval)
+        if interval <= 0:
+            return None
+
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(rate=1.0 / interval)
+            return self.buckets[host]
+
+    def wait(self, url: str):
+        """
+        Wait for the host of a URL to allow another request
+
+        Args:
+            url: URL about to be requested
+        """
+        bucket = self._get_bucket(urlparse(url).netloc.lower())
+        if bucket:
+            bucket.acquire()
@@ -0,0 +1,146 @@
+"""
+Reddit listing backend: direct OAuth JSON calls fanned out over a bounded thread pool
+
+This is not async I/O. Each listing is a blocking requests call run on a
+worker thread; asyncio only schedules the calls, bounds them with a
+semaphore and lets Reddit's X-Ratelimit-* headers pause new requests
+before the budget runs out. The client owns a thread pool and a
+connection pool of the same size (REDDIT_ASYNC_CONCURRENCY), so up to
+that many listings ('hot' and 'new' alike) are in flight at once; beyond
+it, stage time grows by one request latency per extra batch of
+REDDIT_ASYNC_CONCURRENCY subreddits.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import List, Dict, Optional
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import *
+from scrapers.http_transport import build_session
+
+TOKEN_URL = "https://www.reddit.com/api/v1/access_token"
+API_BASE_URL = "https://oauth.reddit.com"
+
+
+class AsyncRedditClient:
+    def __init__(self, max_concurrency: int = REDDIT_ASYNC_CONCURRENCY):
+        self.max_concurrency = max_concurrency
+        # Own pool, sized to the concurrency: the shared session's per-host
+        # limit would otherwise cap requests in flight at HTTP_POOL_MAXSIZE
+        self.session = build_session(pool_maxsize=max_concurrency)
+        self.headers = {'User-Agent': REDDIT_USER_AGENT}
+        self.token = None
+        self.token_expires_at = 0.0
+        self.resume_at = 0.0
+        self.token_lock = threading.Lock()
+
+    def _get_token(self) -> str:
+        """Get an application-only OAuth token, reusing it until it expires"""
+        with self.token_lock:
+            if self.token and time.time() < self.token_expires_at - 60:
+                return self.token
+
+            response = self.session.post(
+                TOKEN_URL,
+                auth=(REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET),
+                data={'grant_type': 'client_credentials'},
+                headers=self.headers,
+                timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+            )
+            response.raise_for_status()
+            data = response.json()
+
+            self.token = data['access_token']
+            self.token_expires_at = time.time() + data.get('expires_in', 3600)
+            return self.token
+
+    def _update_rate_limit(self, headers: Dict):
+        """
+        Pause new requests when Reddit says the rate-limit budget is nearly spent
+
+        Args:
+            headers: Response headers with X-Ratelimit-Remaining / X-Ratelimit-Reset
+        """
+        try:
+            remaining = float(headers.get('X-Ratelimit-Remaining', 'inf'))
+            reset = float(headers.get('X-Ratelimit-Reset', 0))
+        except ValueError:
+            return
+
+        if remaining <= REDDIT_RATELIMIT_MIN_REMAINING:
+            self.resume_at = max(self.resume_at, time.monotonic() + reset)
+
+    def _get_listing(self, subreddit_name: str, sort: str, limit: int):
+        """Blocking GET of one listing page (runs on a worker thread)"""
+        token = self._get_token()
+        return self.session.get(
+            f"{API_BASE_URL}/r/{subreddit_name}/{sort}",
+            params={'limit': min(limit, 100), 'raw_json': 1},
+            headers=dict(self.headers, Authorization=f"bearer {token}"),
+            timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+        )
+
+    async def _listing(self, semaphore: asyncio.Semaphore, executor: ThreadPoolExecutor,
+                       subreddit_name: str, sort: str, limit: int) -> List[SimpleNamespace]:
+        """
+        Fetch one listing page
+
+        Args:
+            semaphore: Bounds the number of requests in flight
+            executor: Worker threads for the blocking HTTP call
+            subreddit_name: Subreddit name (without r/)
+            sort: Listing type (e.g. 'hot')
+            limit: Number of submissions to request (max 100)
+
+        Returns:
+            Submissions with attribute access, like PRAW's
+        """
+        async with semaphore:
+            delay = self.resume_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(executor, self._get_listing, subreddit_name, sort, limit)
+            self._update_rate_limit(response.headers)
+            response.raise_for_status()
+
+        children = response.json().get('data', {}).get('children', [])
+        return [SimpleNamespace(**child['data']) for child in children if child.get('kind') == 't3']
+
+    async def fetch_listings(self, listing_requests: List[Dict]) -> List[Optional[List[SimpleNamespace]]]:
+        """
+        Fetch several listings concurrently
+
+        Args:
+            listing_requests: Listing requests, each with subreddit, sort and limit
+
+        Returns:
+            Submissions per request in input order (None where the request failed)
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        # asyncio's default executor has min(32, CPUs + 4) threads, which
+        # would cap requests in flight below the semaphore on small hosts
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            results = await asyncio.gather(
+                *(self._listing(semaphore, executor, req['subreddit'], req['sort'], req['limit'])
+                  for req in listing_requests),
+                return_exceptions=True
+            )
+
+        listings = []
+        for req, result in zip(listing_requests, results):
+            if isinstance(result, Exception):
+                print(f"Error fetching {req['sort']} from r/{req['subreddit']}: {result}")
+                listings.append(None)
+            else:
+                listings.append(result)
+        return listings
+
+    def run(self, listing_requests: List[Dict]) -> List[Optional[List[SimpleNamespace]]]:
+        """Synchronous entry point for fetch_listings"""
+        return asyncio.run(self.fetch_listings(listing_requests))
@@ -7,6 +7,9 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.config import *
+from scrapers.timestamps import top_k
+from scrapers.reddit_async import AsyncRedditClient
+from common.keyword_matcher import DISCUSSION_MATCHER
 from datetime import datetime, timedelta
 
 class RedditScraper:
@@ -16,6 +19,27 @@ class RedditScraper:
             client_secret=REDDIT_CLIENT_SECRET,
             user_agent=REDDIT_USER_AGENT
         )
+        
+        # Optional fan-out backend (direct JSON listing calls on a bounded thread pool)
+        self.async_client = AsyncRedditClient() if REDDIT_BACKEND == 'async' else None
+    
+    def _is_trending_candidate(self, submission) -> bool:
+        """Skip stickied posts and ads (non-self posts)"""
+        return not (submission.stickied or submission.is_self == False)
+    
+    def _trending_post(self, submission, subreddit_name: str) -> Dict:
+        """Build the post dictionary for a trending submission"""
+        return {
+            'title': submission.title,
+            'content': (submission.selftext or '')[:INGEST_MAX_TEXT_CHARS],
+            'url': f"https://reddit.com{submission.permalink}",
+            'source': f"r/{subreddit_name}",
+            'score': submission.score,
+            'num_comments': submission.num_comments,
+            'created_utc': submission.created_utc,
+            'published_ts': float(submission.created_utc),
+            'content_type': 'reddit_post'
+        }
     
     def get_trending_posts(self, subreddit_name: str, limit: int = 10) -> List[Dict]:
         """
@@ -34,19 +58,10 @@ class RedditScraper:
             posts = []
             for submission in subreddit.hot(limit=limit):
                 # Skip stickied posts and ads
-                if submission.stickied or submission.is_self == False:
+                if not self._is_trending_candidate(submission):
                     continue
                     
-                posts.append({
-                    'title': submission.title,
-                    'content': submission.selftext[:500] if submission.selftext else '',  # First 500 chars
-                    'url': f"https://reddit.com{submission.permalink}",
-                    'source': f"r/{subreddit_name}",
-                    'score': submission.score,
-                    'num_comments': submission.num_comments,
-                    'created_utc': submission.created_utc,
-                    'content_type': 'reddit_post'
-                })
+                posts.append(self._trending_post(submission, subreddit_name))
             
             return posts
             
@@ -54,20 +69,150 @@ class RedditScraper:
             print(f"Error fetching from r/{subreddit_name}: {e}")
             return []
     
+    def get_combined_trending_posts(self, subreddit_names: List[str], limit: int = 10) -> Dict[str, List[Dict]]:
+        """
+        Get trending posts for several subreddits with one multireddit listing
+        
+        The combined hot listing (e.g. r/pslf+personalfinance+studentloans) is
+        split back into per-subreddit lists locally, so the number of API
+        round-trips doesn't grow with the number of subreddits. High-volume
+        subreddits can fill the whole listing, so any subreddit left with
+        fewer than REDDIT_COMBINED_MIN_POSTS posts is fetched on its own.
+        
+        Args:
+            subreddit_names: Names of the subreddits (without r/)
+            limit: Maximum number of posts to keep per subreddit
+            
+        Returns:
+            Dictionary of subreddit name to its list of post dictionaries
+        """
+        # Map Reddit's display names back to the configured names for labelling
+        names = {name.lower(): name for name in subreddit_names}
+        posts = {name: [] for name in subreddit_names}
+        
+        try:
+            multireddit = self.reddit.subreddit('+'.join(subreddit_names))
+            
+            for submission in multireddit.hot(limit=REDDIT_COMBINED_LISTING_LIMIT):
+                name = names.get(submission.subreddit.display_name.lower())
+                if name is None or len(posts[name]) >= limit:
+                    continue
+                
+                # Skip stickied posts and ads
+                if not self._is_trending_candidate(submission):
+                    continue
+                
+                posts[name].append(self._trending_post(submission, name))
+                
+                if all(len(subreddit_posts) >= limit for subreddit_posts in posts.values()):
+                    break
+            
+        except Exception as e:
+            print(f"Error fetching from r/{'+'.join(subreddit_names)}: {e}")
+        
+        # Give subreddits crowded out of the combined listing their own call
+        for name in subreddit_names:
+            if len(posts[name]) < min(REDDIT_COMBINED_MIN_POSTS, limit):
+                print(f"  r/{name} had {len(posts[name])} posts in the combined listing, fetching it separately")
+                posts[name] = self.get_trending_posts(name, limit=limit)
+        
+        return posts
+    
     def get_all_reddit_content(self) -> List[Dict]:
         """
         Get trending posts from all configured subreddits
         """
-        all_posts = []
+        if REDDIT_BACKEND == 'async':
+            # All subreddit listings in flight at once
+            subreddit_posts = self.get_trending_posts_async(REDDIT_SUBREDDITS, limit=MAX_REDDIT_POSTS)
+        elif REDDIT_COMBINED_LISTING:
+            # One listing call for all subreddits
+            subreddit_posts = list(self.get_combined_trending_posts(REDDIT_SUBREDDITS, limit=MAX_REDDIT_POSTS).values())
+        else:
+            subreddit_posts = []
+            for subreddit in REDDIT_SUBREDDITS:
+                posts = self.get_trending_posts(subreddit, limit=MAX_REDDIT_POSTS)
+                subreddit_posts.append(posts)
         
-        for subreddit in REDDIT_SUBREDDITS:
-            posts = self.get_trending_posts(subreddit, limit=MAX_REDDIT_POSTS)
-            all_posts.extend(posts)
+        # Keep the most upvoted posts across subreddits
+        return top_k(subreddit_posts, MAX_REDDIT_POSTS * len(REDDIT_SUBREDDITS), key=lambda x: x['score'])
+    
+    def get_trending_posts_async(self, subreddit_names: List[str], limit: int = 10) -> List[List[Dict]]:
+        """
+        Get trending posts for several subreddits concurrently with the async backend
         
-        # Sort by score (most upvoted first)
-        all_posts.sort(key=lambda x: x['score'], reverse=True)
+        Args:
+            subreddit_names: Names of the subreddits (without r/)
+            limit: Maximum number of posts to fetch per subreddit
+            
+        Returns:
+            List of post lists, one per subreddit
+        """
+        listings = self.async_client.run([
+            {'subreddit': name, 'sort': 'hot', 'limit': limit} for name in subreddit_names
+        ])
         
-        return all_posts[:MAX_REDDIT_POSTS * len(REDDIT_SUBREDDITS)]
+        subreddit_posts = []
+        for name, submissions in zip(subreddit_names, listings):
+            subreddit_posts.append([
+                self._trending_post(submission, name)
+                for submission in submissions or []
+                if self._is_trending_candidate(submission)
+            ])
+        return subreddit_posts
+    
+    def _collect_discussions(self, submissions, subreddit_name: str, cutoff_time: float) -> List[Dict]:
+        """
+        Build discussion posts from a 'new' listing
+        
+        Args:
+            submissions: Submissions from the listing (PRAW or async backend)
+            subreddit_name: Name of the subreddit
+            cutoff_time: Ignore posts created before this epoch
+            
+        Returns:
+            List of discussion posts
+        """
+        discussions = []
+        for submission in submissions:
+            # Skip if too old
+            if submission.created_utc < cutoff_time:
+                continue
+                
+            # Look for question posts or discussion posts
+            if DISCUSSION_MATCHER.matches(submission.title):
+                discussions.append({
+                    'title': submission.title,
+                    'content': (submission.selftext or '')[:INGEST_MAX_TEXT_CHARS],
+                    'url': f"https://reddit.com{submission.permalink}",
+                    'source': f"r/{subreddit_name}",
+                    'score': submission.score,
+                    'num_comments': submission.num_comments,
+                    'created_utc': submission.created_utc,
+                    'published_ts': float(submission.created_utc),
+                    'content_type': 'reddit_discussion'
+                })
+        
+        return discussions
+    
+    def get_recent_discussions_async(self, subreddit_names: List[str], hours_back: int = 24) -> List[List[Dict]]:
+        """
+        Get recent discussion posts for several subreddits concurrently with the async backend
+        
+        Args:
+            subreddit_names: Names of the subreddits (without r/)
+            hours_back: How many hours back to look
+            
+        Returns:
+            List of discussion lists, one per subreddit
+        """
+        cutoff_time = datetime.now().timestamp() - (hours_back * 3600)
+        listings = self.async_client.run([
+            {'subreddit': name, 'sort': 'new', 'limit': 50} for name in subreddit_names
+        ])
+        
+        return [self._collect_discussions(submissions or [], name, cutoff_time)
+                for name, submissions in zip(subreddit_names, listings)]
     
     def get_recent_discussions(self, subreddit_name: str, hours_back: int = 24) -> List[Dict]:
         """
@@ -84,27 +229,7 @@ class RedditScraper:
             subreddit = self.reddit.subreddit(subreddit_name)
             cutoff_time = datetime.now().timestamp() - (hours_back * 3600)
             
-            discussions = []
-            for submission in subreddit.new(limit=50):
-                # Skip if too old
-                if submission.created_utc < cutoff_time:
-                    continue
-                    
-                # Look for question posts or discussion posts
-                title_lower = submission.title.lower()
-                if any(keyword in title_lower for keyword in ['question', 'help', 'advice', 'what', 'how', 'why', 'should']):
-                    discussions.append({
-                        'title': submission.title,
-                        'content': submission.selftext[:300] if submission.selftext else '',
-                        'url': f"https://reddit.com{submission.permalink}",
-                        'source': f"r/{subreddit_name}",
-                        'score': submission.score,
-                        'num_comments': submission.num_comments,
-                        'created_utc': submission.created_utc,
-                        'content_type': 'reddit_discussion'
-                    })
-            
-            return discussions
+            return self._collect_discussions(subreddit.new(limit=50), subreddit_name, cutoff_time)
             
         except Exception as e:
             print(f"Error fetching discussions from r/{subreddit_name}: {e}")
@@ -0,0 +1,129 @@
+"""
+Per-source high-water marks so scrapers only process entries newer than the last run
+
+Cursor moves are staged in memory and only written by commit(), which the
+curator calls once the digest has been sent. A run that fails after
+fetching leaves the stored cursors untouched, so its items are fetched
+again next time.
+"""
+import calendar
+import json
+import os
+import threading
+from datetime import datetime
+from typing import List, Dict, Optional
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import *
+
+
+def feed_entry_id(entry: Dict) -> str:
+    """Stable identifier for a feed entry (GUID, falling back to the link)"""
+    return entry.get('id') or entry.get('link', '')
+
+
+def feed_entry_timestamp(entry: Dict) -> Optional[float]:
+    """Published time of a feed entry as a UTC epoch, if the feed provides one"""
+    published = entry.get('published_parsed') or entry.get('updated_parsed')
+    if published:
+        return float(calendar.timegm(published))
+    return None
+
+
+class SourceCursorStore:
+    def __init__(self, storage_file: str = SOURCE_CURSOR_FILE):
+        self.storage_file = storage_file
+        self.cursors = self._load_cursors()
+        self.staged = {}
+        self.lock = threading.Lock()
+
+    def _load_cursors(self) -> Dict:
+        """Load cursors from file"""
+        if os.path.exists(self.storage_file):
+            try:
+                with open(self.storage_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, FileNotFoundError):
+                return {}
+        return {}
+
+    def commit(self):
+        """Merge the cursors moved during this run into the file on disk"""
+        with self.lock:
+            if not self.staged:
+                return
+            try:
+                stored = self._load_cursors()
+                stored.update(self.staged)
+                with open(self.storage_file, 'w', encoding='utf-8') as f:
+                    json.dump(stored, f, indent=2, ensure_ascii=False)
+                self.staged = {}
+            except Exception as e:
+                print(f"Error saving source cursors: {e}")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Get the cursor for a source
+
+        Args:
+            key: Source key, e.g. "rss:<feed url>" or "youtube:<channel id>"
+
+        Returns:
+            Cursor dictionary, or None if the source has never been read
+        """
+        if not INCREMENTAL_FETCH:
+            return None
+        return self.cursors.get(key)
+
+    def update(self, key: str, **values):
+        """
+        Move a source's cursor forward (staged until commit)
+
+        Args:
+            key: Source key
+            **values: Cursor fields to store (e.g. last_id, last_published)
+        """
+        with self.lock:
+            cursor = dict(self.cursors.get(key, {}))
+            cursor.update(values)
+            cursor['updated_at'] = datetime.now().isoformat()
+            self.cursors[key] = cursor
+            self.staged[key] = cursor
+
+    def new_feed_entries(self, key: str, entries: List[Dict], limit: int = 5) -> List[Dict]:
+        """
+        Take feed entries newer than the stored cursor and stage its advance
+
+        Feeds list the newest entry first, so reading stops at the first
+        entry already covered by the cursor.
+
+        Args:
+            key: Source key for the feed
+            entries: Parsed feed entries, newest first
+            limit: Maximum number of entries to return
+
+        Returns:
+            List of new entries
+        """
+        cursor = self.get(key) or {}
+        last_id = cursor.get('last_id')
+        last_published = cursor.get('last_published')
+
+        new_entries = []
+        for entry in entries[:limit]:
+            published = feed_entry_timestamp(entry)
+            if last_id and feed_entry_id(entry) == last_id:
+                break
+            if last_published and published and published <= last_published:
+                break
+            new_entries.append(entry)
+
+        if new_entries:
+            timestamps = [ts for ts in (feed_entry_timestamp(e) for e in new_entries) if ts]
+            self.update(
+                key,
+                last_id=feed_entry_id(new_entries[0]),
+                last_published=max(timestamps + [last_published or 0]) or None
+            )
+
+        return new_entries
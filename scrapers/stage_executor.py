@@ -0,0 +1,99 @@
+"""
+Parallel fan-out executor for the content-fetching stages of a curator run
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, List
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import *
+
+
+class ParallelStageExecutor:
+    def __init__(self, timeouts: Dict[str, float] = None, default_timeout: float = DEFAULT_SOURCE_TIMEOUT):
+        """
+        Run independent fetch stages concurrently, each with its own deadline
+
+        Args:
+            timeouts: Per-stage timeout in seconds
+            default_timeout: Timeout for stages not listed in timeouts
+        """
+        self.timeouts = timeouts if timeouts is not None else SOURCE_TIMEOUTS
+        self.default_timeout = default_timeout
+        self.timings = {}
+
+    def run(self, stages: Dict[str, Callable[[], List[Dict]]]) -> Dict[str, List[Dict]]:
+        """
+        Run all stages and collect whatever finishes in time
+
+        A stage that raises or overruns its deadline contributes an empty
+        list instead of failing the whole run.
+
+        Args:
+            stages: Mapping of stage name to a callable returning content items
+
+        Returns:
+            Mapping of stage name to its content items
+        """
+        results = {name: [] for name in stages}
+        self.timings = {}
+
+        executor = ThreadPoolExecutor(max_workers=max(1, len(stages)))
+        start = time.monotonic()
+        futures = {executor.submit(func): name for name, func in stages.items()}
+        deadlines = {name: start + self.timeouts.get(name, self.default_timeout) for name in stages}
+        pending = set(futures)
+
+        try:
+            while pending:
+                next_deadline = min(deadlines[futures[future]] for future in pending)
+                done, pending = wait(pending, timeout=max(0, next_deadline - time.monotonic()),
+                                     return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    name = futures[future]
+                    elapsed = time.monotonic() - start
+                    try:
+                        results[name] = future.result()
+                        self.timings[name] = {'seconds': elapsed, 'status': 'ok'}
+                    except Exception as e:
+                        print(f"  Error in {name} stage: {e}")
+                        self.timings[name] = {'seconds': elapsed, 'status': 'error'}
+
+                # Give up on stages past their deadline and keep what finished
+                now = time.monotonic()
+                for future in list(pending):
+                    name = futures[future]
+                    if now >= deadlines[name]:
+                        print(f"  {name} stage timed out after {now - start:.1f}s, continuing without it")
+                        self.timings[name] = {'seconds': now - start, 'status': 'timeout'}
+                        future.cancel()
+                        pending.discard(future)
+        finally:
+            # Don't block on overrunning stages; their threads finish in the background
+            # (cancel_futures only stops stages that haven't started)
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return results
+
+    def succeeded(self, name: str) -> bool:
+        """
+        Check whether a stage finished in time without raising
+
+        A stage that timed out may still be running in the background, so
+        callers must not commit anything it staged.
+
+        Args:
+            name: Stage name
+
+        Returns:
+            True if the stage's results were used
+        """
+        return self.timings.get(name, {}).get('status') == 'ok'
+
+    def print_report(self):
+        """Print per-stage latency for the last run"""
+        print("\n  Source latency:")
+        for name, timing in sorted(self.timings.items(), key=lambda item: item[1]['seconds'], reverse=True):
+            print(f"    {name:12} {timing['seconds']:6.1f}s  {timing['status']}")
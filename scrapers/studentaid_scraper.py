@@ -3,14 +3,20 @@ Alternative StudentAid.gov data integration using official sources
 Since StudentAid.gov uses JavaScript for dynamic content loading,
 we'll use their official data sources and RSS feeds instead.
 """
-import requests
-import feedparser
 from datetime import datetime, timedelta
 from typing import List, Dict
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.config import *
+from scrapers.http_cache import ConditionalGetCache
+from scrapers.http_transport import read_capped
+from scrapers.page_fingerprint import PageChangeDetector, describe_changes
+from scrapers.source_cursors import SourceCursorStore
+from scrapers.feed_parser import parse_feed
+from scrapers.timestamps import to_epoch
+from scrapers.circuit_breaker import CircuitBreakerRegistry
+from common.keyword_matcher import STUDENT_AID_MATCHER
 
 class StudentAidDataIntegration:
     def __init__(self):
@@ -24,6 +30,11 @@ class StudentAidDataIntegration:
             'ed_gov_news': 'https://www.ed.gov/news',
             'studentaid_data_center': 'https://studentaid.gov/data-center'
         }
+        
+        self.http_cache = ConditionalGetCache()
+        self.cursors = SourceCursorStore()
+        self.breakers = CircuitBreakerRegistry()
+        self.change_detector = PageChangeDetector()
     
     def fetch_ed_gov_rss(self) -> List[Dict]:
         """
@@ -32,24 +43,29 @@ class StudentAidDataIntegration:
         articles = []
         
         try:
-            feed = feedparser.parse(self.data_sources['ed_gov_rss'])
+            response = self.breakers.call(self.data_sources['ed_gov_rss'], self.http_cache.fetch,
+                                          self.data_sources['ed_gov_rss'], headers=self.headers)
+            
+            # 304 Not Modified: no new entries since the last poll
+            if response is None:
+                return articles
             
-            for entry in feed.entries[:5]:  # Limit to 5 items
-                if hasattr(entry, 'title') and hasattr(entry, 'summary'):
-                    # Filter for student aid related content
-                    title_lower = entry.title.lower()
-                    summary_lower = entry.summary.lower()
-                    
-                    if any(keyword in title_lower or keyword in summary_lower 
-                          for keyword in ['student', 'loan', 'aid', 'financial aid', 'pslf', 'forgiveness']):
-                        articles.append({
-                            'title': entry.title,
-                            'description': entry.summary,
-                            'url': entry.link,
-                            'source': 'U.S. Department of Education',
-                            'published_at': entry.get('published', ''),
-                            'content_type': 'studentaid_official'
-                        })
+            feed_key = f"rss:{self.data_sources['ed_gov_rss']}"
+            cursor = self.cursors.get(feed_key) or {}
+            feed = parse_feed(response.content, max_items=5, stop_at_id=cursor.get('last_id'))
+            
+            for entry in self.cursors.new_feed_entries(feed_key, feed['entries'], limit=5):  # Limit to 5 new items
+                # Filter for student aid related content
+                if STUDENT_AID_MATCHER.matches(entry['title'], entry['summary']):
+                    articles.append({
+                        'title': entry['title'],
+                        'description': entry['summary'],
+                        'url': entry['link'],
+                        'source': 'U.S. Department of Education',
+                        'published_at': entry['published'],
+                        'published_ts': to_epoch(entry['published_parsed']),
+                        'content_type': 'studentaid_official'
+                    })
                         
         except Exception as e:
             print(f"Error fetching ed.gov RSS: {e}")
@@ -62,20 +78,27 @@ class StudentAidDataIntegration:
         """
         articles = []
         
+        url = self.data_sources['studentaid_data_center']
+        
         try:
-            response = requests.get(self.data_sources['studentaid_data_center'], 
-                                 headers=self.headers, timeout=30)
-            response.raise_for_status()
+            response = self.breakers.call(url, self.http_cache.fetch, url, headers=self.headers, stream=True)
             
-            # Since this page uses JavaScript, we'll look for any static content
-            # that might indicate new data or updates
-            if 'new' in response.text.lower() or 'updated' in response.text.lower():
+            # 304 Not Modified: the page hasn't changed since the last poll
+            if response is None:
+                return articles
+            
+            content = read_capped(response, STUDENTAID_MAX_PAGE_BYTES)
+            
+            # Only report an update when the dataset links, dates or headings change
+            changes = self.change_detector.check(url, content)
+            if changes:
                 articles.append({
                     'title': 'StudentAid.gov Data Center Updates',
-                    'description': 'New data or updates available in the StudentAid.gov Data Center. Check the official data center for the latest information.',
-                    'url': self.data_sources['studentaid_data_center'],
+                    'description': f"The StudentAid.gov Data Center changed. {describe_changes(changes)}",
+                    'url': url,
                     'source': 'StudentAid.gov Data Center',
                     'published_at': datetime.now().strftime('%Y-%m-%d'),
+                    'published_ts': datetime.now().timestamp(),
                     'content_type': 'studentaid_data_update'
                 })
                 
@@ -103,7 +126,15 @@ class StudentAidDataIntegration:
         all_content.extend(data_updates)
         print(f"  Found {len(data_updates)} data updates")
         
+        self.http_cache.print_stats("StudentAid")
+        
         return all_content
+    
+    def commit_progress(self):
+        """Save this run's feed cursor, validators and page fingerprints (call once the digest is sent)"""
+        self.cursors.commit()
+        self.http_cache.commit()
+        self.change_detector.commit()
 
 # Update the original StudentAidScraper to use this new approach
 class StudentAidScraper(StudentAidDataIntegration):
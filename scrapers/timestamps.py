@@ -0,0 +1,84 @@
+"""
+Timestamp normalization and top-K selection across content sources
+
+Sources report publish times in different shapes (RFC-822 strings from
+RSS, ISO-8601 from NewsAPI and YouTube, epoch floats from Reddit), so
+every item gets a numeric 'published_ts' at ingestion for ordering.
+"""
+import calendar
+import heapq
+import itertools
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Optional, Iterable, Callable
+
+
+def parse_timestamp(value: str) -> Optional[datetime]:
+    """
+    Parse an RFC-822 or ISO-8601 date string
+
+    Args:
+        value: Date string
+
+    Returns:
+        Timezone-aware datetime (UTC if the string had no zone), or None
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def to_epoch(value) -> float:
+    """
+    Convert any supported timestamp to a UTC epoch
+
+    Args:
+        value: Epoch number, datetime, UTC struct_time or date string
+
+    Returns:
+        Seconds since the epoch, or 0.0 if the value is missing or unparseable
+    """
+    if value is None or value == '':
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, time.struct_time):
+        return float(calendar.timegm(value))
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+
+    parsed = parse_timestamp(str(value))
+    return parsed.timestamp() if parsed else 0.0
+
+
+def top_k(sources: Iterable[List[Dict]], k: int, key: Callable = lambda item: item.get('published_ts', 0.0)) -> List[Dict]:
+    """
+    Select the k highest-ranked items across several source lists
+
+    Uses a bounded heap, so the cost is O(n log k) instead of a full sort.
+    Ties keep their original order.
+
+    Args:
+        sources: Lists of items, one per source
+        k: Number of items to keep
+        key: Ranking key (newest first by default)
+
+    Returns:
+        Top k items, best first
+    """
+    return heapq.nlargest(k, itertools.chain.from_iterable(sources), key=key)
@@ -0,0 +1,123 @@
+"""
+Persistent YouTube channel metadata cache
+
+A channel's uploads playlist ID and title practically never change, so
+they are looked up once and reused for weeks instead of costing a
+channels().list call on every run. Entries in YOUTUBE_CHANNELS that are
+not real channel IDs are resolved once and the result (including "not
+found") is cached as well; a name lookup only counts if the channel's
+title or handle matches the configured name.
+"""
+import json
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import *
+
+# Real channel IDs are "UC" followed by 22 URL-safe base64 characters
+CHANNEL_ID_PATTERN = re.compile(r'^UC[0-9A-Za-z_-]{22}$')
+
+
+def is_channel_id(entry: str) -> bool:
+    """Check whether a configured channel entry is a real channel ID"""
+    return bool(CHANNEL_ID_PATTERN.match(entry))
+
+
+def _normalize_name(name: str) -> str:
+    """Lowercase a channel name and drop everything but letters and digits"""
+    return re.sub(r'[^0-9a-z]', '', (name or '').lower())
+
+
+def channel_matches(name: str, snippet: Dict) -> bool:
+    """
+    Check whether a channel found by name is the one that was configured
+
+    Args:
+        name: Configured channel name (e.g. "StudentLoanPlanner")
+        snippet: The channel's snippet from channels().list
+
+    Returns:
+        True if the name appears in the channel's title or handle
+    """
+    wanted = _normalize_name(name)
+    if not wanted:
+        return False
+    return any(wanted in _normalize_name(snippet.get(field, '')) for field in ('title', 'customUrl'))
+
+
+class ChannelMetadataCache:
+    def __init__(self, storage_file: str = YOUTUBE_CHANNEL_CACHE_FILE,
+                 ttl_days: int = YOUTUBE_CHANNEL_CACHE_TTL_DAYS,
+                 negative_ttl_days: int = YOUTUBE_CHANNEL_NEGATIVE_TTL_DAYS):
+        self.storage_file = storage_file
+        self.ttl = timedelta(days=ttl_days)
+        self.negative_ttl = timedelta(days=negative_ttl_days)
+        self.channels = self._load_cache()
+
+    def _load_cache(self) -> Dict:
+        """Load cached channel metadata from file"""
+        if os.path.exists(self.storage_file):
+            try:
+                with open(self.storage_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, FileNotFoundError):
+                return {}
+        return {}
+
+    def _save_entry(self, entry: str, metadata: Dict):
+        """Merge one channel's metadata into the file on disk"""
+        try:
+            stored = self._load_cache()
+            stored[entry] = metadata
+            with open(self.storage_file, 'w', encoding='utf-8') as f:
+                json.dump(stored, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            print(f"Error saving YouTube channel cache: {e}")
+
+    def get(self, entry: str) -> Optional[Dict]:
+        """
+        Get cached metadata for a configured channel entry
+
+        Args:
+            entry: Entry from YOUTUBE_CHANNELS (channel ID or name)
+
+        Returns:
+            Metadata dictionary (with 'not_found' set for channels that could
+            not be resolved), or None if missing or expired
+        """
+        metadata = self.channels.get(entry)
+        if not metadata:
+            return None
+
+        ttl = self.negative_ttl if metadata.get('not_found') else self.ttl
+        if datetime.now() - datetime.fromisoformat(metadata['cached_at']) > ttl:
+            return None
+        return metadata
+
+    def put(self, entry: str, channel_id: str, uploads_playlist_id: str, title: str):
+        """
+        Cache a resolved channel
+
+        Args:
+            entry: Entry from YOUTUBE_CHANNELS
+            channel_id: Real channel ID
+            uploads_playlist_id: ID of the channel's uploads playlist
+            title: Channel title
+        """
+        metadata = {
+            'channel_id': channel_id,
+            'uploads_playlist_id': uploads_playlist_id,
+            'title': title,
+            'cached_at': datetime.now().isoformat()
+        }
+        self.channels[entry] = metadata
+        self._save_entry(entry, metadata)
+
+    def put_not_found(self, entry: str):
+        """Cache that a channel entry could not be resolved"""
+        metadata = {'not_found': True, 'cached_at': datetime.now().isoformat()}
+        self.channels[entry] = metadata
+        self._save_entry(entry, metadata)
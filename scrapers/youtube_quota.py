@@ -0,0 +1,189 @@
+"""
+YouTube Data API quota ledger and search planner
+
+Every Data API call costs quota units (a search costs 100, list calls on
+videos, channels and playlist items cost 1) against a daily quota that
+resets at midnight Pacific time. The ledger records units spent across
+runs, and the planner spreads the expensive searches over the day's
+scheduled runs so later runs still have budget left.
+"""
+import json
+import os
+import threading
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+import pytz
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import *
+
+# Quota units per call for the endpoints we use
+QUOTA_COSTS = {
+    'search': 100,
+    'videos': 1,
+    'channels': 1,
+    'playlistItems': 1
+}
+
+# The daily quota resets at midnight Pacific time
+QUOTA_TIMEZONE = pytz.timezone('US/Pacific')
+
+
+class QuotaExceededError(Exception):
+    """Raised when a call is skipped (or rejected) because the daily quota is spent"""
+
+
+def is_quota_exceeded_error(error: Exception) -> bool:
+    """Check whether an API error is YouTube's 403 quotaExceeded response"""
+    status = getattr(getattr(error, 'resp', None), 'status', None)
+    content = getattr(error, 'content', b'') or b''
+    return status == 403 and (b'quotaExceeded' in content or b'dailyLimitExceeded' in content)
+
+
+class YouTubeQuotaLedger:
+    def __init__(self, storage_file: str = YOUTUBE_QUOTA_FILE, daily_quota: int = YOUTUBE_DAILY_QUOTA):
+        self.storage_file = storage_file
+        self.daily_quota = daily_quota
+        self.lock = threading.Lock()
+        self.run_units = {}
+        self.ledger = self._load_ledger()
+
+    def _today(self) -> str:
+        """Current quota day (Pacific time)"""
+        return datetime.now(QUOTA_TIMEZONE).strftime('%Y-%m-%d')
+
+    def _load_ledger(self) -> Dict:
+        """Load today's ledger from file, starting fresh on a new quota day"""
+        ledger = {}
+        if os.path.exists(self.storage_file):
+            try:
+                with open(self.storage_file, 'r', encoding='utf-8') as f:
+                    ledger = json.load(f)
+            except (json.JSONDecodeError, FileNotFoundError):
+                ledger = {}
+
+        if ledger.get('date') != self._today():
+            ledger = {'date': self._today(), 'units': 0, 'exhausted': False}
+        return ledger
+
+    def _save_ledger(self):
+        """Save the ledger to file (callers hold self.lock)"""
+        try:
+            with open(self.storage_file, 'w', encoding='utf-8') as f:
+                json.dump(self.ledger, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            print(f"Error saving YouTube quota ledger: {e}")
+
+    def _roll_over(self):
+        """Reset the ledger if the quota day changed during the run"""
+        if self.ledger.get('date') != self._today():
+            self.ledger = {'date': self._today(), 'units': 0, 'exhausted': False}
+
+    def remaining(self) -> int:
+        """Units left today"""
+        with self.lock:
+            self._roll_over()
+            if self.ledger['exhausted']:
+                return 0
+            return max(0, self.daily_quota - self.ledger['units'])
+
+    def can_spend(self, endpoint: str, calls: int = 1) -> bool:
+        """Check whether calls to an endpoint fit in today's remaining quota"""
+        return QUOTA_COSTS[endpoint] * calls <= self.remaining()
+
+    def spend(self, endpoint: str, calls: int = 1):
+        """
+        Record units spent on calls to an endpoint
+
+        Args:
+            endpoint: Endpoint name (key of QUOTA_COSTS)
+            calls: Number of calls made
+        """
+        units = QUOTA_COSTS[endpoint] * calls
+        with self.lock:
+            self._roll_over()
+            self.ledger['units'] += units
+            self.run_units[endpoint] = self.run_units.get(endpoint, 0) + units
+            self._save_ledger()
+
+    def mark_exhausted(self):
+        """Stop spending for the rest of the quota day after a quotaExceeded response"""
+        with self.lock:
+            self._roll_over()
+            if not self.ledger['exhausted']:
+                print("YouTube quota exceeded, skipping Data API calls until the daily reset")
+            self.ledger['exhausted'] = True
+            self._save_ledger()
+
+    def print_stats(self):
+        """Print units spent this run and what is left for the day"""
+        spent = sum(self.run_units.values())
+        breakdown = ", ".join(f"{endpoint} {units}" for endpoint, units in self.run_units.items())
+        print(f"  YouTube quota: {spent} units this run ({breakdown or 'no calls'}), "
+              f"{self.remaining()}/{self.daily_quota} left today")
+
+
+def _current_run_slot(now: Optional[datetime] = None) -> Tuple[int, int]:
+    """
+    Find which of today's scheduled runs this is
+
+    Args:
+        now: Current time (defaults to now in the schedule's timezone)
+
+    Returns:
+        Tuple of (slot index, number of slots today)
+    """
+    schedule = SCHEDULE_CONFIG['weekdays']
+    tz = pytz.timezone(schedule['timezone'])
+    now = now.astimezone(tz) if now else datetime.now(tz)
+    if now.weekday() >= 5:
+        schedule = SCHEDULE_CONFIG['weekends']
+
+    times = sorted(schedule['times'])
+    current = now.strftime('%H:%M')
+    # Runs start on the scheduled minute; anything earlier counts as the first slot
+    slot = max(0, sum(1 for t in times if t <= current) - 1)
+    return slot, len(times)
+
+
+def unique_queries(queries: List[str]) -> List[str]:
+    """De-duplicate search queries, ignoring case and extra whitespace"""
+    seen = set()
+    unique = []
+    for query in queries:
+        key = ' '.join(query.lower().split())
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(query)
+    return unique
+
+
+def plan_searches(queries: List[str], ledger: YouTubeQuotaLedger,
+                  reserve: int = YOUTUBE_QUOTA_RESERVE, now: Optional[datetime] = None) -> List[str]:
+    """
+    Pick the searches to run this time
+
+    Queries are assigned round-robin to the day's scheduled runs, so each
+    query is searched once a day. The run may also only spend its share of
+    what is left after keeping `reserve` units for cheap channel polling.
+
+    Args:
+        queries: Candidate search queries
+        ledger: Quota ledger
+        reserve: Units kept back for list calls
+        now: Current time (for testing)
+
+    Returns:
+        Queries to search in this run
+    """
+    queries = unique_queries(queries)
+    slot, slots = _current_run_slot(now)
+    planned = [query for i, query in enumerate(queries) if i % slots == slot]
+
+    runs_left = slots - slot
+    run_budget = max(0, ledger.remaining() - reserve) // runs_left
+    affordable = run_budget // QUOTA_COSTS['search']
+
+    if affordable < len(planned):
+        print(f"  YouTube quota: running {affordable} of {len(planned)} planned searches")
+    return planned[:affordable]
@@ -2,168 +2,380 @@
 YouTube scraping module for financial channels
 """
 from googleapiclient.discovery import build
-from typing import List, Dict
+from typing import List, Dict, Optional
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.config import *
-from datetime import datetime, timedelta
+from scrapers.feed_parser import parse_feed
+from scrapers.http_cache import ConditionalGetCache
+from scrapers.source_cursors import SourceCursorStore
+from scrapers.timestamps import to_epoch, parse_timestamp, top_k
+from scrapers.youtube_channel_cache import ChannelMetadataCache, channel_matches, is_channel_id
+from scrapers.youtube_quota import YouTubeQuotaLedger, QuotaExceededError, is_quota_exceeded_error, plan_searches
+from datetime import datetime, timedelta, timezone
 
 class YouTubeScraper:
     def __init__(self):
         self.youtube = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
+        self.cursors = SourceCursorStore()
+        self.quota = YouTubeQuotaLedger()
+        self.channel_cache = ChannelMetadataCache()
+        self.http_cache = ConditionalGetCache()
+        self.feed_url = YOUTUBE_FEED_URL
     
-    def get_channel_videos(self, channel_id: str, max_results: int = 5) -> List[Dict]:
+    def _execute(self, endpoint: str, request):
         """
-        Get recent videos from a YouTube channel
+        Execute a Data API request, charging its cost to the quota ledger
         
         Args:
-            channel_id: YouTube channel ID
-            max_results: Maximum number of videos to fetch
+            endpoint: Endpoint name ('search', 'videos', 'channels', 'playlistItems')
+            request: Request object from the API client
             
         Returns:
-            List of video dictionaries
+            API response
+            
+        Raises:
+            QuotaExceededError: If the quota is spent, or YouTube rejected the call for quota
         """
+        if not self.quota.can_spend(endpoint):
+            raise QuotaExceededError(f"not enough YouTube quota left for {endpoint}")
+        
+        # Rejected calls still cost quota, so charge before executing
+        self.quota.spend(endpoint)
         try:
-            # Get channel's uploads playlist
-            channel_response = self.youtube.channels().list(
-                part='contentDetails',
-                id=channel_id
-            ).execute()
-            
-            if not channel_response['items']:
-                print(f"Channel {channel_id} not found")
-                return []
+            return request.execute()
+        except Exception as e:
+            if is_quota_exceeded_error(e):
+                self.quota.mark_exhausted()
+                raise QuotaExceededError(f"YouTube rejected {endpoint} call: quotaExceeded") from e
+            raise
+    
+    def _resolve_channel(self, entry: str) -> Optional[Dict]:
+        """
+        Get a configured channel's metadata, looking it up only when the cache has none
+        
+        Entries that are not real channel IDs (e.g. "UCStudentLoanPlanner") are
+        tried as a legacy username first (1 unit), then as a channel search
+        (100 units). A channel found by name is only accepted if its title or
+        handle matches the name; otherwise the entry is cached as not found and
+        retried after YOUTUBE_CHANNEL_NEGATIVE_TTL_DAYS. Either way the result
+        is cached, so this happens once.
+        
+        Args:
+            entry: Entry from YOUTUBE_CHANNELS
+            
+        Returns:
+            Metadata with channel_id, uploads_playlist_id and title, or None if not found
+        """
+        cached = self.channel_cache.get(entry)
+        if cached:
+            return None if cached.get('not_found') else cached
+        
+        if is_channel_id(entry):
+            channel_response = self._execute('channels', self.youtube.channels().list(
+                part='snippet,contentDetails',
+                id=entry
+            ))
+        else:
+            # Handle-style entries: drop a mistaken "UC" prefix to get the name
+            name = entry[2:] if entry.startswith('UC') else entry.lstrip('@')
+            channel_response = self._execute('channels', self.youtube.channels().list(
+                part='snippet,contentDetails',
+                forUsername=name
+            ))
+            
+            if not channel_response.get('items'):
+                search_response = self._execute('search', self.youtube.search().list(
+                    part='snippet',
+                    q=name,
+                    type='channel',
+                    maxResults=1
+                ))
+                channel_ids = [item['snippet']['channelId'] for item in search_response.get('items', [])]
+                channel_response = {'items': []}
+                if channel_ids:
+                    channel_response = self._execute('channels', self.youtube.channels().list(
+                        part='snippet,contentDetails',
+                        id=channel_ids[0]
+                    ))
+        
+        if not channel_response.get('items'):
+            print(f"Channel {entry} not found")
+            self.channel_cache.put_not_found(entry)
+            return None
+        
+        channel = channel_response['items'][0]
+        
+        # A username or search hit may be a different channel; don't cache a wrong match for weeks
+        if not is_channel_id(entry) and not channel_matches(name, channel['snippet']):
+            print(f"Channel {entry} resolved to {channel['snippet']['title']} ({channel['id']}), "
+                  f"which doesn't match the configured name; skipping it")
+            self.channel_cache.put_not_found(entry)
+            return None
+        
+        self.channel_cache.put(
+            entry,
+            channel_id=channel['id'],
+            uploads_playlist_id=channel['contentDetails']['relatedPlaylists']['uploads'],
+            title=channel['snippet']['title']
+        )
+        print(f"Resolved YouTube channel {entry} to {channel['snippet']['title']} ({channel['id']})")
+        return self.channel_cache.get(entry)
+    
+    def _list_channel_uploads(self, channel_id: str, max_results: int = 5) -> List[Dict]:
+        """
+        List a channel's latest uploads without fetching their details
+        
+        Args:
+            channel_id: Entry from YOUTUBE_CHANNELS (channel ID or name)
+            max_results: Maximum number of videos to list
             
-            uploads_playlist_id = channel_response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
+        Returns:
+            List of video stubs (video_id, source, content_type)
+        """
+        try:
+            channel = self._resolve_channel(channel_id)
+            if not channel:
+                return []
             
             # Get videos from uploads playlist
-            playlist_response = self.youtube.playlistItems().list(
+            playlist_response = self._execute('playlistItems', self.youtube.playlistItems().list(
                 part='snippet',
-                playlistId=uploads_playlist_id,
+                playlistId=channel['uploads_playlist_id'],
                 maxResults=max_results
-            ).execute()
+            ))
             
-            videos = []
-            for item in playlist_response['items']:
-                video_id = item['snippet']['resourceId']['videoId']
-                snippet = item['snippet']
-                
-                # Get additional video details
-                video_response = self.youtube.videos().list(
-                    part='snippet,statistics',
-                    id=video_id
-                ).execute()
-                
-                if video_response['items']:
-                    video_details = video_response['items'][0]
-                    video_snippet = video_details['snippet']
-                    video_stats = video_details.get('statistics', {})
-                    
-                    videos.append({
-                        'title': video_snippet['title'],
-                        'description': video_snippet['description'][:500],  # First 500 chars
-                        'url': f"https://www.youtube.com/watch?v={video_id}",
-                        'source': snippet['channelTitle'],
-                        'published_at': video_snippet['publishedAt'],
-                        'view_count': int(video_stats.get('viewCount', 0)),
-                        'like_count': int(video_stats.get('likeCount', 0)),
-                        'content_type': 'youtube_video'
-                    })
-            
-            return videos
+            return [{
+                'video_id': item['snippet']['resourceId']['videoId'],
+                'source': item['snippet']['channelTitle'] or channel['title'],
+                'content_type': 'youtube_video'
+            } for item in playlist_response['items']]
             
         except Exception as e:
             print(f"Error fetching videos from channel {channel_id}: {e}")
             return []
     
-    def search_financial_videos(self, query: str, max_results: int = 5) -> List[Dict]:
+    def _poll_channel_feed(self, channel_id: str, max_results: int = 5) -> List[Dict]:
         """
-        Search for financial videos on YouTube
+        List a channel's new uploads from its public Atom feed
+        
+        The feed costs no Data API quota and is fetched with a conditional
+        GET, so an unchanged channel is a cheap 304. Only videos newer than
+        the channel's cursor are returned.
+        
+        Args:
+            channel_id: Entry from YOUTUBE_CHANNELS (channel ID or name)
+            max_results: Maximum number of videos to list
+            
+        Returns:
+            List of video stubs (video_id, source, content_type)
+        """
+        try:
+            # Real channel IDs need no lookup; names are resolved once through the cache
+            if is_channel_id(channel_id):
+                feed_channel_id, title = channel_id, None
+            else:
+                channel = self._resolve_channel(channel_id)
+                if not channel:
+                    return []
+                feed_channel_id, title = channel['channel_id'], channel['title']
+            
+            response = self.http_cache.fetch(self.feed_url.format(channel_id=feed_channel_id))
+            if response is None:
+                return []  # 304 Not Modified: no new uploads
+            
+            cursor_key = f"youtube_feed:{feed_channel_id}"
+            cursor = self.cursors.get(cursor_key) or {}
+            feed = parse_feed(response.content, max_items=max_results, accept=None, stop_at_id=cursor.get('last_id'))
+            new_entries = self.cursors.new_feed_entries(cursor_key, feed['entries'], limit=max_results)
+            
+            return [{
+                'video_id': entry.get('video_id') or entry['id'].rsplit(':', 1)[-1],
+                'source': title or feed['title'],
+                'content_type': 'youtube_video'
+            } for entry in new_entries]
+            
+        except Exception as e:
+            print(f"Error polling feed for channel {channel_id}: {e}")
+            return []
+    
+    def _search_video_stubs(self, query: str, max_results: int = 5) -> List[Dict]:
+        """
+        Search for videos without fetching their details
         
         Args:
             query: Search query
             max_results: Maximum number of videos to return
             
         Returns:
-            List of video dictionaries
+            List of video stubs (video_id, content_type)
         """
         try:
+            # Search the last 7 days, or only since the newest video found on a previous run
+            published_after = (datetime.now(timezone.utc) - timedelta(days=7)).strftime('%Y-%m-%dT%H:%M:%SZ')
+            cursor_key = f"youtube_search:{query.lower()}"
+            cursor = self.cursors.get(cursor_key)
+            if cursor and cursor.get('published_after', '') > published_after:
+                published_after = cursor['published_after']
+            
             # Search for videos
-            search_response = self.youtube.search().list(
+            search_response = self._execute('search', self.youtube.search().list(
                 part='snippet',
                 q=query,
                 type='video',
                 order='relevance',
-                publishedAfter=(datetime.now() - timedelta(days=7)).isoformat() + 'Z',
+                publishedAfter=published_after,
                 maxResults=max_results
-            ).execute()
+            ))
             
-            videos = []
-            for item in search_response['items']:
-                video_id = item['id']['videoId']
-                
-                # Get video details
-                video_response = self.youtube.videos().list(
-                    part='snippet,statistics',
-                    id=video_id
-                ).execute()
-                
-                if video_response['items']:
-                    video_details = video_response['items'][0]
-                    video_snippet = video_details['snippet']
-                    video_stats = video_details.get('statistics', {})
-                    
-                    videos.append({
-                        'title': video_snippet['title'],
-                        'description': video_snippet['description'][:500],
-                        'url': f"https://www.youtube.com/watch?v={video_id}",
-                        'source': video_snippet['channelTitle'],
-                        'published_at': video_snippet['publishedAt'],
-                        'view_count': int(video_stats.get('viewCount', 0)),
-                        'like_count': int(video_stats.get('likeCount', 0)),
-                        'content_type': 'youtube_search'
-                    })
-            
-            return videos
+            # publishedAfter is inclusive, so step one second past the newest video
+            published = (parse_timestamp(item['snippet']['publishedAt']) for item in search_response['items'])
+            newest = max((ts for ts in published if ts), default=None)
+            if newest:
+                newest_time = newest.astimezone(timezone.utc) + timedelta(seconds=1)
+                self.cursors.update(cursor_key, published_after=newest_time.strftime('%Y-%m-%dT%H:%M:%SZ'))
+            
+            return [{
+                'video_id': item['id']['videoId'],
+                'content_type': 'youtube_search'
+            } for item in search_response['items']]
             
         except Exception as e:
             print(f"Error searching YouTube for '{query}': {e}")
             return []
     
+    def _fetch_video_details(self, video_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Fetch snippet and statistics for many videos in as few calls as possible
+        
+        The Data API accepts up to 50 comma-separated IDs per videos().list
+        call, each costing one quota unit.
+        
+        Args:
+            video_ids: Video IDs (duplicates are ignored)
+            
+        Returns:
+            Dictionary of video ID to its API resource
+        """
+        unique_ids = list(dict.fromkeys(video_ids))
+        details = {}
+        
+        for start in range(0, len(unique_ids), VIDEO_DETAILS_BATCH_SIZE):
+            batch = unique_ids[start:start + VIDEO_DETAILS_BATCH_SIZE]
+            try:
+                video_response = self._execute('videos', self.youtube.videos().list(
+                    part='snippet,statistics',
+                    id=','.join(batch)
+                ))
+                
+                for item in video_response['items']:
+                    details[item['id']] = item
+                    
+            except Exception as e:
+                print(f"Error fetching details for {len(batch)} YouTube videos: {e}")
+        
+        return details
+    
+    def _build_videos(self, stubs: List[Dict]) -> List[Dict]:
+        """
+        Resolve video stubs into full video dictionaries with one batched lookup
+        
+        Args:
+            stubs: Video stubs from channel listings and searches
+            
+        Returns:
+            List of video dictionaries (videos without details are dropped)
+        """
+        details = self._fetch_video_details([stub['video_id'] for stub in stubs])
+        
+        videos = []
+        for stub in stubs:
+            video_details = details.get(stub['video_id'])
+            if not video_details:
+                continue
+            
+            video_snippet = video_details['snippet']
+            video_stats = video_details.get('statistics', {})
+            
+            videos.append({
+                'title': video_snippet['title'],
+                'description': video_snippet['description'][:INGEST_MAX_TEXT_CHARS],
+                'url': f"https://www.youtube.com/watch?v={stub['video_id']}",
+                'source': stub.get('source') or video_snippet['channelTitle'],
+                'published_at': video_snippet['publishedAt'],
+                'published_ts': to_epoch(video_snippet['publishedAt']),
+                'view_count': int(video_stats.get('viewCount', 0)),
+                'like_count': int(video_stats.get('likeCount', 0)),
+                'content_type': stub['content_type']
+            })
+        
+        return videos
+    
+    def get_channel_videos(self, channel_id: str, max_results: int = 5) -> List[Dict]:
+        """
+        Get recent videos from a YouTube channel
+        
+        Args:
+            channel_id: YouTube channel ID
+            max_results: Maximum number of videos to fetch
+            
+        Returns:
+            List of video dictionaries
+        """
+        return self._build_videos(self._list_channel_uploads(channel_id, max_results))
+    
+    def search_financial_videos(self, query: str, max_results: int = 5) -> List[Dict]:
+        """
+        Search for financial videos on YouTube
+        
+        Args:
+            query: Search query
+            max_results: Maximum number of videos to return
+            
+        Returns:
+            List of video dictionaries
+        """
+        return self._build_videos(self._search_video_stubs(query, max_results))
+    
     def get_all_youtube_content(self) -> List[Dict]:
         """
         Get all YouTube content from channels and searches
         """
-        all_videos = []
+        stubs = []
         
-        # Get videos from specific channels
+        # Poll channels first; feeds are free and playlist listings cost 1 unit against 100 per search
         for channel_id in YOUTUBE_CHANNELS:
-            channel_videos = self.get_channel_videos(channel_id, max_results=3)
-            all_videos.extend(channel_videos)
+            if YOUTUBE_CHANNEL_BACKEND == 'feed':
+                stubs.extend(self._poll_channel_feed(channel_id, max_results=3))
+            else:
+                stubs.extend(self._list_channel_uploads(channel_id, max_results=3))
         
-        # Search for trending financial topics and expert content
-        search_queries = YOUTUBE_EXPERT_SEARCHES + [
-            "student loan forgiveness 2025",
-            "PSLF public service loan forgiveness", 
-            "personal finance tips 2025",
-            "inflation impact young adults"
-        ]
+        # Spread the expensive searches across the day's scheduled runs
+        search_queries = plan_searches(YOUTUBE_EXPERT_SEARCHES + YOUTUBE_TOPIC_SEARCHES, self.quota)
         
         for query in search_queries:
-            search_videos = self.search_financial_videos(query, max_results=2)
-            all_videos.extend(search_videos)
+            stubs.extend(self._search_video_stubs(query, max_results=2))
         
-        # Remove duplicates based on URL
-        seen_urls = set()
-        unique_videos = []
+        # Remove duplicates by video ID (the first listing wins, as before)
+        seen_ids = set()
+        unique_stubs = []
         
-        for video in all_videos:
-            if video['url'] not in seen_urls:
-                seen_urls.add(video['url'])
-                unique_videos.append(video)
+        for stub in stubs:
+            if stub['video_id'] not in seen_ids:
+                seen_ids.add(stub['video_id'])
+                unique_stubs.append(stub)
         
-        # Sort by view count (most popular first)
-        unique_videos.sort(key=lambda x: x['view_count'], reverse=True)
+        # Resolve details for every video of the run in one batched lookup
+        unique_videos = self._build_videos(unique_stubs)
+        self.quota.print_stats()
+        if YOUTUBE_CHANNEL_BACKEND == 'feed':
+            self.http_cache.print_stats("YouTube feeds")
         
-        return unique_videos[:MAX_YOUTUBE_VIDEOS]
+        # Keep the most viewed videos (most popular first)
+        return top_k([unique_videos], MAX_YOUTUBE_VIDEOS, key=lambda x: x['view_count'])
+    
+    def commit_progress(self):
+        """Save this run's feed/search cursors and feed validators (call once the digest is sent)"""
+        self.cursors.commit()
+        self.http_cache.commit()
@@ -0,0 +1,277 @@
+"""
+Test the OpenAI Batch API summarization mode against a local stand-in server
+"""
+import json
+import os
+import re
+import tempfile
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+# The client needs a key to build; requests only ever reach the local server
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+import openai
+import ai_processing.ai_summarizer as ai_summarizer
+import ai_processing.batch_summarizer as batch_summarizer
+from ai_processing.ai_summarizer import AISummarizer
+
+
+def completion(content):
+    """Minimal chat completion body"""
+    return {
+        'id': 'chatcmpl-test', 'object': 'chat.completion', 'created': 0, 'model': 'gpt-4o-mini',
+        'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': content}}],
+        'usage': {'prompt_tokens': 100, 'completion_tokens': 20, 'total_tokens': 120}
+    }
+
+
+def title_of(request_body):
+    """Pull the item title out of a summarization request"""
+    return re.search(r'Title: (.*)', request_body['messages'][-1]['content']).group(1)
+
+
+class StandInOpenAI(BaseHTTPRequestHandler):
+    """Just enough of the Files, Batches and Chat Completions endpoints"""
+    files = {}
+    batches = {}
+    polls_until_complete = 2
+
+    def _send_json(self, data, status=200):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def do_POST(self):
+        body = self._read_body()
+
+        if self.path == '/v1/files':
+            # Keep the JSONL lines out of the multipart upload
+            lines = [line for line in body.decode('utf-8').splitlines() if line.startswith('{"custom_id"')]
+            file_id = f"file-{len(self.files) + 1}"
+            StandInOpenAI.files[file_id] = '\n'.join(lines)
+            self._send_json({'id': file_id, 'object': 'file', 'bytes': len(body), 'created_at': 0,
+                             'filename': 'requests.jsonl', 'purpose': 'batch', 'status': 'processed'})
+
+        elif self.path == '/v1/batches':
+            request = json.loads(body)
+            batch_id = f"batch-{len(self.batches) + 1}"
+            # Like the real API, reject input files that repeat a custom_id
+            custom_ids = [json.loads(line)['custom_id']
+                          for line in StandInOpenAI.files[request['input_file_id']].splitlines()]
+            status = 'failed' if len(custom_ids) != len(set(custom_ids)) else 'in_progress'
+            StandInOpenAI.batches[batch_id] = {
+                'id': batch_id, 'object': 'batch', 'endpoint': request['endpoint'],
+                'input_file_id': request['input_file_id'], 'completion_window': '24h',
+                'status': status, 'created_at': 0, 'polls': 0
+            }
+            self._send_json(self._public(StandInOpenAI.batches[batch_id]))
+
+        elif re.match(r'^/v1/batches/[\w-]+/cancel$', self.path):
+            batch = StandInOpenAI.batches[self.path.split('/')[3]]
+            batch['status'] = 'cancelled'
+            self._send_json(self._public(batch))
+
+        elif self.path == '/v1/chat/completions':
+            request = json.loads(body)
+            if request.get('response_format'):
+                items = json.loads(request['messages'][-1]['content'])
+                summaries = {item['id']: f"Sync summary of {item['title']}" for item in items}
+                self._send_json(completion(json.dumps({'summaries': summaries})))
+            else:
+                self._send_json(completion(f"Sync summary of {title_of(request)}"))
+
+        else:
+            self._send_json({'error': {'message': 'not found'}}, status=404)
+
+    def do_GET(self):
+        match = re.match(r'^/v1/batches/([\w-]+)$', self.path)
+        if match:
+            batch = StandInOpenAI.batches[match.group(1)]
+            batch['polls'] += 1
+            if batch['status'] == 'in_progress' and batch['polls'] >= StandInOpenAI.polls_until_complete:
+                self._complete(batch)
+            self._send_json(self._public(batch))
+            return
+
+        match = re.match(r'^/v1/files/([\w-]+)/content$', self.path)
+        if match:
+            body = StandInOpenAI.files[match.group(1)].encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self._send_json({'error': {'message': 'not found'}}, status=404)
+
+    def _complete(self, batch):
+        """Answer every request in the batch's input file"""
+        results = []
+        for line in StandInOpenAI.files[batch['input_file_id']].splitlines():
+            request = json.loads(line)
+            results.append(json.dumps({
+                'id': f"req-{request['custom_id'][:8]}", 'custom_id': request['custom_id'], 'error': None,
+                'response': {'status_code': 200, 'request_id': 'r',
+                             'body': completion(f"Batch summary of {title_of(request['body'])}")}
+            }))
+        output_id = f"file-out-{batch['id']}"
+        StandInOpenAI.files[output_id] = '\n'.join(results)
+        batch.update({'status': 'completed', 'output_file_id': output_id})
+
+    @staticmethod
+    def _public(batch):
+        return {key: value for key, value in batch.items() if key != 'polls'}
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_summarizer(server):
+    """Summarizer in Batch API mode talking to the stand-in server"""
+    summarizer = AISummarizer()
+    summarizer.client = openai.OpenAI(api_key='test-key', base_url=f"http://127.0.0.1:{server.server_port}/v1",
+                                      max_retries=0)
+    return summarizer
+
+
+def run_in_temp_dir(test):
+    """Run a test against a fresh stand-in server, with state files in a temp dir"""
+    def wrapper():
+        StandInOpenAI.files = {}
+        StandInOpenAI.batches = {}
+        server = HTTPServer(('127.0.0.1', 0), StandInOpenAI)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        saved = (os.getcwd(), ai_summarizer.SUMMARY_MODE,
+                 batch_summarizer.BATCH_API_POLL_SECONDS, batch_summarizer.BATCH_API_MAX_WAIT_MINUTES)
+        ai_summarizer.SUMMARY_MODE = 'batch_api'
+        batch_summarizer.BATCH_API_POLL_SECONDS = 0.05
+
+        try:
+            with tempfile.TemporaryDirectory() as storage_dir:
+                os.chdir(storage_dir)
+                try:
+                    test(server)
+                finally:
+                    os.chdir(saved[0])
+        finally:
+            (_, ai_summarizer.SUMMARY_MODE,
+             batch_summarizer.BATCH_API_POLL_SECONDS, batch_summarizer.BATCH_API_MAX_WAIT_MINUTES) = saved
+            server.shutdown()
+            server.server_close()
+    wrapper.__name__ = test.__name__
+    return wrapper
+
+
+ITEMS = [{'title': f"Item {i}", 'description': f"<p>About item {i}.</p>", 'source': 'Test'} for i in range(3)]
+
+
+@run_in_temp_dir
+def test_batch_results_merged_in_order(server):
+    """A batch is submitted, polled to completion and merged back by item"""
+    StandInOpenAI.polls_until_complete = 2
+    batch_summarizer.BATCH_API_MAX_WAIT_MINUTES = 1
+
+    summaries = make_summarizer(server).summarize_all([dict(item) for item in ITEMS])
+
+    assert summaries == ["Batch summary of Item 0", "Batch summary of Item 1", "Batch summary of Item 2"], summaries
+    assert len(StandInOpenAI.batches) == 1
+    assert not os.path.exists(batch_summarizer.BATCH_API_STATE_FILE)
+    print("SUCCESS: Batch results merged back in input order")
+
+
+def leave_pending_batch(server, items):
+    """Submit a batch for items and record it, as a run stopped mid-wait would"""
+    summarizer = make_summarizer(server)
+    contents = [ai_summarizer.prepare_content(dict(item)) for item in items]
+    batch_api = batch_summarizer.BatchApiSummarizer(summarizer)
+    batch_api._save_state([batch_api.submit(contents, [summarizer._summary_cache_key(c) for c in contents])])
+
+
+@run_in_temp_dir
+def test_late_batch_cancelled(server):
+    """A batch still running at the deadline is cancelled and its items summarized synchronously"""
+    StandInOpenAI.polls_until_complete = 1000
+    batch_summarizer.BATCH_API_MAX_WAIT_MINUTES = 0
+
+    summaries = make_summarizer(server).summarize_all([dict(item) for item in ITEMS])
+
+    assert summaries == ["Sync summary of Item 0", "Sync summary of Item 1", "Sync summary of Item 2"], summaries
+    assert StandInOpenAI.batches['batch-1']['status'] == 'cancelled'
+    assert not os.path.exists(batch_summarizer.BATCH_API_STATE_FILE)
+    print("SUCCESS: Late batch cancelled before the synchronous fallback")
+
+
+@run_in_temp_dir
+def test_pending_batch_resumed_after_restart(server):
+    """A batch left by a run that stopped mid-wait is resumed, not resubmitted, by the next process"""
+    StandInOpenAI.polls_until_complete = 2
+    batch_summarizer.BATCH_API_MAX_WAIT_MINUTES = 1
+    leave_pending_batch(server, ITEMS)
+
+    summaries = make_summarizer(server).summarize_all([dict(item) for item in ITEMS])
+    assert summaries == ["Batch summary of Item 0", "Batch summary of Item 1", "Batch summary of Item 2"], summaries
+    assert len(StandInOpenAI.batches) == 1
+    assert not os.path.exists(batch_summarizer.BATCH_API_STATE_FILE)
+    print("SUCCESS: Pending batch resumed after restart")
+
+
+@run_in_temp_dir
+def test_stale_batch_does_not_block_new_items(server):
+    """A run with new items submits its own batch and doesn't wait on an earlier run's batch"""
+    StandInOpenAI.polls_until_complete = 2
+    leave_pending_batch(server, ITEMS[:2])
+    StandInOpenAI.batches['batch-1']['polls'] = -1000
+
+    # New items: batch-1 is checked once, batch-2 is submitted and waited on
+    batch_summarizer.BATCH_API_MAX_WAIT_MINUTES = 1
+    new_items = [{'title': 'Item 9', 'description': '<p>About item 9.</p>', 'source': 'Test'}]
+    summarizer = make_summarizer(server)
+    summaries = summarizer.summarize_all([dict(item) for item in new_items])
+    summarizer.summary_cache.save()
+    assert summaries == ["Batch summary of Item 9"], summaries
+    assert StandInOpenAI.batches['batch-1']['polls'] == -1000 + 1
+    assert StandInOpenAI.batches['batch-1']['status'] == 'in_progress'
+
+    # Once batch-1 finishes, a later run caches its results
+    StandInOpenAI.batches['batch-1']['polls'] = StandInOpenAI.polls_until_complete - 1
+    summarizer = make_summarizer(server)
+    summarizer.summarize_all([{'title': 'Item 8', 'description': '<p>About item 8.</p>', 'source': 'Test'}])
+    key = summarizer._summary_cache_key(ai_summarizer.prepare_content(dict(ITEMS[0])))
+    assert summarizer.summary_cache.get(key) == "Batch summary of Item 0"
+    assert len(StandInOpenAI.batches) == 3
+    assert not os.path.exists(batch_summarizer.BATCH_API_STATE_FILE)
+    print("SUCCESS: Stale batch checked once while new items got their own batch")
+
+
+@run_in_temp_dir
+def test_duplicate_items_share_one_request(server):
+    """Items with identical text are sent once and the result is shared"""
+    StandInOpenAI.polls_until_complete = 2
+    batch_summarizer.BATCH_API_MAX_WAIT_MINUTES = 1
+
+    items = [dict(ITEMS[0]), dict(ITEMS[0]), dict(ITEMS[1])]
+    summaries = make_summarizer(server).summarize_all(items)
+
+    assert summaries == ["Batch summary of Item 0", "Batch summary of Item 0", "Batch summary of Item 1"], summaries
+    batch = StandInOpenAI.batches['batch-1']
+    assert batch['status'] == 'completed', batch
+    assert len(StandInOpenAI.files[batch['input_file_id']].splitlines()) == 2
+    print("SUCCESS: Duplicate items share one batch request")
+
+
+if __name__ == "__main__":
+    print("Testing Batch API summarization...")
+    print("=" * 50)
+    test_batch_results_merged_in_order()
+    test_late_batch_cancelled()
+    test_pending_batch_resumed_after_restart()
+    test_stale_batch_does_not_block_new_items()
+    test_duplicate_items_share_one_request()
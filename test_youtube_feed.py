@@ -0,0 +1,143 @@
+"""
+Test the YouTube Atom feed channel backend against a local feed server
+"""
+import os
+import tempfile
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+# The Data API client needs a key to build, but these tests never call it
+os.environ.setdefault('YOUTUBE_API_KEY', 'test-key')
+
+import scrapers.youtube_scraper as youtube_scraper
+from scrapers.youtube_scraper import YouTubeScraper
+from scrapers.http_cache import ConditionalGetCache
+from scrapers.source_cursors import SourceCursorStore
+from scrapers.youtube_quota import YouTubeQuotaLedger
+
+# config may already have been imported (without the key) by another test
+youtube_scraper.YOUTUBE_API_KEY = youtube_scraper.YOUTUBE_API_KEY or 'test-key'
+
+CHANNEL_ID = "UCabcdefghijklmnopqrstuv"
+
+ENTRY_TEMPLATE = """
+  <entry>
+    <id>yt:video:{video_id}</id>
+    <yt:videoId>{video_id}</yt:videoId>
+    <yt:channelId>{channel_id}</yt:channelId>
+    <title>Video {video_id}</title>
+    <link rel="alternate" href="https://www.youtube.com/watch?v={video_id}"/>
+    <published>{published}</published>
+    <media:group>
+      <media:title>Video {video_id}</media:title>
+      <media:description>About student loans</media:description>
+    </media:group>
+  </entry>"""
+
+
+def build_feed(videos):
+    """Build an uploads feed for (video_id, published) pairs, newest first"""
+    entries = ''.join(
+        ENTRY_TEMPLATE.format(video_id=video_id, channel_id=CHANNEL_ID, published=published)
+        for video_id, published in videos
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" xmlns:media="http://search.yahoo.com/mrss/" xmlns="http://www.w3.org/2005/Atom">
+  <id>yt:channel:{CHANNEL_ID}</id>
+  <title>Test Channel</title>{entries}
+</feed>""".encode('utf-8')
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    """Serves the current feed, answering 304 when the client's ETag matches"""
+    feed = b''
+    etag = ''
+    requests = []
+
+    def do_GET(self):
+        FeedHandler.requests.append(self.path)
+        if self.headers.get('If-None-Match') == FeedHandler.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/atom+xml')
+        self.send_header('ETag', FeedHandler.etag)
+        self.send_header('Content-Length', str(len(FeedHandler.feed)))
+        self.end_headers()
+        self.wfile.write(FeedHandler.feed)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def publish(videos, version):
+    """Replace the served feed"""
+    FeedHandler.feed = build_feed(videos)
+    FeedHandler.etag = f'"v{version}"'
+
+
+def make_scraper(server, storage_dir):
+    """Build a scraper whose caches live in a temp dir and whose feeds come from the local server"""
+    scraper = YouTubeScraper()
+    scraper.http_cache = ConditionalGetCache(os.path.join(storage_dir, 'http_cache.json'))
+    scraper.cursors = SourceCursorStore(os.path.join(storage_dir, 'source_cursors.json'))
+    scraper.quota = YouTubeQuotaLedger(os.path.join(storage_dir, 'youtube_quota.json'))
+    scraper.feed_url = f"http://127.0.0.1:{server.server_port}/feeds/videos.xml?channel_id={{channel_id}}"
+    return scraper
+
+
+def test_feed_backend():
+    """New uploads are found once, unchanged feeds cost a 304 and no quota"""
+    server = HTTPServer(('127.0.0.1', 0), FeedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        with tempfile.TemporaryDirectory() as storage_dir:
+            scraper = make_scraper(server, storage_dir)
+            FeedHandler.requests = []
+
+            # First poll: the latest uploads are all new
+            publish([('vid3', '2025-06-03T12:00:00+00:00'),
+                     ('vid2', '2025-06-02T12:00:00+00:00'),
+                     ('vid1', '2025-06-01T12:00:00+00:00')], version=1)
+            stubs = scraper._poll_channel_feed(CHANNEL_ID, max_results=3)
+            assert [stub['video_id'] for stub in stubs] == ['vid3', 'vid2', 'vid1'], stubs
+            assert all(stub['source'] == 'Test Channel' for stub in stubs), stubs
+            assert FeedHandler.requests[0] == f"/feeds/videos.xml?channel_id={CHANNEL_ID}"
+
+            # Unchanged feed: 304, nothing to escalate
+            stubs = scraper._poll_channel_feed(CHANNEL_ID, max_results=3)
+            assert stubs == [], stubs
+            assert scraper.http_cache.get_stats()['hits'] == 1
+
+            # One new upload: only its ID comes back
+            publish([('vid4', '2025-06-04T12:00:00+00:00'),
+                     ('vid3', '2025-06-03T12:00:00+00:00'),
+                     ('vid2', '2025-06-02T12:00:00+00:00')], version=2)
+            stubs = scraper._poll_channel_feed(CHANNEL_ID, max_results=3)
+            assert [stub['video_id'] for stub in stubs] == ['vid4'], stubs
+
+            # Nothing is stored until the run commits, so a failed run's uploads come back
+            rerun = make_scraper(server, storage_dir)
+            stubs = rerun._poll_channel_feed(CHANNEL_ID, max_results=3)
+            assert [stub['video_id'] for stub in stubs] == ['vid4', 'vid3', 'vid2'], stubs
+
+            # After the commit a fresh process reuses the stored ETag and cursor
+            scraper.commit_progress()
+            scraper = make_scraper(server, storage_dir)
+            assert scraper._poll_channel_feed(CHANNEL_ID, max_results=3) == []
+
+            # Feed polling never touches the Data API
+            assert scraper.quota.run_units == {}
+            print("SUCCESS: Feed backend returns only new uploads and honours 304s")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    print("Testing YouTube feed backend...")
+    print("=" * 50)
+    test_feed_backend()